@@ -1,12 +1,73 @@
 """
 Base CrawlerAgent class for web crawling operations.
 """
-import json
+import io
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
 
 import google.generativeai as genai
 from abc import ABC, abstractmethod
 
-from crawler_agent.utils import proto_to_dict
+from crawler_agent.utils import RequestRateLimiter, dump_json, estimate_tokens, proto_to_dict
+
+# Default caps on agent requests and tokens per minute (gemini-2.0-flash-lite's free tier allows
+# 30 and 1,000,000); override with AGENT_RPM / AGENT_TPM in the environment or .env, 0 disables a limit
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+
+# (request limiter, token limiter) per model name, shared by every agent instance since the
+# quota belongs to the API key and model rather than to an agent
+_rate_limiters: Dict[str, Tuple[Optional[RequestRateLimiter], Optional[RequestRateLimiter]]] = {}
+_rate_limiters_lock = threading.Lock()
+
+# Processes drawing on the same quota at once; each process's limiters get this share of it
+_rate_limit_processes = 1
+
+# Seconds each thread has spent waiting on the limiters, so callers can leave it out of timings
+_throttle_wait = threading.local()
+
+
+def set_rate_limit_processes(processes: int):
+    """
+    Split the per-minute budget evenly across worker processes that share the quota.
+
+    Call it once in each worker before the first request, with the number of workers.
+
+    Args:
+        processes (int): Number of processes sending agent requests at the same time
+    """
+    global _rate_limit_processes
+    with _rate_limiters_lock:
+        _rate_limit_processes = max(1, processes)
+        _rate_limiters.clear()
+
+
+def throttle_wait_seconds() -> float:
+    """Return the total seconds the current thread has waited on the rate limiters."""
+    return getattr(_throttle_wait, "seconds", 0.0)
+
+
+def get_rate_limiters(model_name: str) -> Tuple[Optional[RequestRateLimiter], Optional[RequestRateLimiter]]:
+    """
+    Return the request and token limiters for a model, creating them on first use.
+
+    Args:
+        model_name (str): Name of the model the requests go to
+
+    Returns:
+        Tuple of the requests-per-minute and tokens-per-minute limiters (None where disabled)
+    """
+    with _rate_limiters_lock:
+        if model_name not in _rate_limiters:
+            requests_per_minute = int(os.getenv("AGENT_RPM", DEFAULT_REQUESTS_PER_MINUTE))
+            tokens_per_minute = int(os.getenv("AGENT_TPM", DEFAULT_TOKENS_PER_MINUTE))
+            _rate_limiters[model_name] = (
+                RequestRateLimiter(requests_per_minute / _rate_limit_processes) if requests_per_minute > 0 else None,
+                RequestRateLimiter(tokens_per_minute / _rate_limit_processes) if tokens_per_minute > 0 else None
+            )
+        return _rate_limiters[model_name]
 
 
 class BaseCrawlerAgent(ABC):
@@ -39,15 +100,58 @@ class BaseCrawlerAgent(ABC):
             transport="rest",
         )
     
-    @abstractmethod
+    def _generate_content(self, model, prompt: str):
+        """
+        Send a prompt to the model, waiting for room in the model's per-minute request and token budgets.
+
+        Args:
+            model: Configured GenerativeModel
+            prompt (str): The prompt to send
+
+        Returns:
+            The model's response
+        """
+        request_limiter, token_limiter = get_rate_limiters(self.model_name)
+        estimated_tokens = estimate_tokens(prompt)
+        wait_start = time.perf_counter()
+        if request_limiter:
+            request_limiter.acquire()
+        if token_limiter:
+            token_limiter.acquire(estimated_tokens)
+        _throttle_wait.seconds = throttle_wait_seconds() + time.perf_counter() - wait_start
+
+        response = model.generate_content(prompt)
+
+        # Settle the estimate against the tokens the API actually counted
+        usage = getattr(response, "usage_metadata", None)
+        if token_limiter and usage:
+            token_limiter.record(usage.total_token_count - estimated_tokens)
+        return response
+
     def process_html(self, html_file_path: str, config_file_path: str):
         """
-        Abstract method to process HTML content.
+        Process an HTML file.
         
         Args:
             html_file_path (str): Path to the HTML file to process
             config_file_path (str): Path to the configuration file
             
+        Returns:
+            Processed data from the HTML
+        """
+        with open(html_file_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        return self.process_html_content(html_content, config_file_path)
+    
+    @abstractmethod
+    def process_html_content(self, html_content: str, config_file_path: str):
+        """
+        Abstract method to process HTML content that is already in memory.
+        
+        Args:
+            html_content (str): The HTML to process
+            config_file_path (str): Path to the configuration file
+            
         Returns:
             Processed data from the HTML
         """
@@ -60,13 +164,18 @@ class BaseCrawlerAgent(ABC):
         Args:
             structured_data: The structured data to save
             output_file (str): Output file path
+
+        Returns:
+            The saved data as a plain dictionary, or None if there was nothing to save
         """
         if structured_data:
-            with open(output_file, "w", encoding="utf-8") as outfile:
-                json.dump(proto_to_dict(structured_data), outfile, indent=2, ensure_ascii=False)
+            saved_data = proto_to_dict(structured_data)
+            dump_json(saved_data, output_file)
             print(f"Results saved successfully to {output_file}!")
+            return saved_data
         else:
             print("No data to save - tool was not used!")
+            return None
 
     def process_and_save(self, html_file_path: str, config_file_path: str, output_file: str):
         """
@@ -76,6 +185,27 @@ class BaseCrawlerAgent(ABC):
             html_file_path (str): Path to the HTML file to process
             config_file_path (str): Path to the configuration file
             output_file (str): Output file path
+
+        Returns:
+            The saved data as a plain dictionary, or None if nothing was saved
         """
         structured_data = self.process_html(html_file_path, config_file_path)
-        self.save_results_to_file(structured_data, output_file)
+        return self.save_results_to_file(structured_data, output_file)
+
+    def process_bytes_and_save(self, html_bytes: bytes, config_file_path: str, output_file: str):
+        """
+        Process raw HTML bytes and save results to file, for callers that already read the
+        HTML file (e.g. to share it between several agents).
+
+        Args:
+            html_bytes (bytes): Raw content of the HTML file
+            config_file_path (str): Path to the configuration file
+            output_file (str): Output file path
+
+        Returns:
+            The saved data as a plain dictionary, or None if nothing was saved
+        """
+        # Decode exactly as process_html's text-mode read does (UTF-8, universal newlines)
+        html_content = io.TextIOWrapper(io.BytesIO(html_bytes), encoding='utf-8').read()
+        structured_data = self.process_html_content(html_content, config_file_path)
+        return self.save_results_to_file(structured_data, output_file)
@@ -4,8 +4,10 @@ BasicAgent implementation for simple structured data extraction from HTML withou
 
 import json
 import re
+from typing import Dict, Any
 import google.generativeai as genai
 from crawler_agent.agents.base import BaseCrawlerAgent
+from crawler_agent.utils import load_config
 
 
 class BasicAgent(BaseCrawlerAgent):
@@ -13,47 +15,28 @@ class BasicAgent(BaseCrawlerAgent):
     Basic implementation of CrawlerAgent for extracting structured data from HTML
     using simple prompting without function calling tools.
     """
-    
-    def process_html(self, html_file_path: str, config_file_path: str):
+
+    def process_html_content(self, html_content: str, config_file_path: str):
         """
         Process HTML content and extract structured data using basic prompting.
         
         Args:
-            html_file_path (str): Path to the HTML file to process
+            html_content (str): The HTML to process
             config_file_path (str): Path to the configuration file
             
         Returns:
             Structured data extracted from the HTML
         """
         # Load configuration from JSON file
-        with open(config_file_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-
-        # Define system prompt for Basic Agent role
-        system_prompt = """You are a Web Data Extraction Agent."""
-
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_prompt
-        )
-
-        # Build field descriptions for the prompt
-        field_descriptions = []
-        for field_name, field_config in config["fields"].items():
-            field_desc = f"- {field_name}: {field_config['description']}"
-            if field_config.get("required", False):
-                field_desc += " (required)"
-            field_descriptions.append(field_desc)
+        config = load_config(config_file_path)
 
+        model = self._create_model()
         object_name = config.get("object_name", "data")
         
         prompt = f"""Extract the {config['object_description']} from the following HTML content.
 
         TARGET FIELDS TO EXTRACT:
-        {chr(10).join(field_descriptions)}
+        {self._build_field_descriptions(config)}
         
         Please provide the extracted data in this JSON format:
         {{
@@ -67,20 +50,11 @@ class BasicAgent(BaseCrawlerAgent):
         HTML CONTENT:
         {html_content}"""
         
-        response = model.generate_content(prompt)
+        response = self._generate_content(model, prompt)
         
         # Parse JSON response
         try:
-            response_text = response.text.strip()
-            # Clean up response text (remove code blocks if present)
-            if "```json" in response_text:
-                response_text = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL).group(1)
-            elif "```" in response_text:
-                response_text = re.search(r'```\s*(.*?)\s*```', response_text, re.DOTALL).group(1)
-            
-            # Parse JSON
-            result = json.loads(response_text)
-            return result
+            return self._parse_json_response(response.text)
             
         except (json.JSONDecodeError, AttributeError) as e:
             print(f"Failed to parse JSON response: {e}")
@@ -89,3 +63,32 @@ class BasicAgent(BaseCrawlerAgent):
             return {
                 object_name: {field_name: None for field_name in config["fields"].keys()}
             }
+
+    def _create_model(self):
+        """Create the GenerativeModel used for extraction."""
+        # Define system prompt for Basic Agent role
+        system_prompt = """You are a Web Data Extraction Agent."""
+
+        return genai.GenerativeModel(
+            model_name=self.model_name,
+            system_instruction=system_prompt
+        )
+
+    def _build_field_descriptions(self, config: Dict[str, Any]) -> str:
+        """Build the target field list for the prompt."""
+        field_descriptions = []
+        for field_name, field_config in config["fields"].items():
+            field_desc = f"- {field_name}: {field_config['description']}"
+            if field_config.get("required", False):
+                field_desc += " (required)"
+            field_descriptions.append(field_desc)
+        return chr(10).join(field_descriptions)
+
+    def _parse_json_response(self, response_text: str):
+        """Parse a JSON response, removing code blocks if present."""
+        response_text = response_text.strip()
+        if "```json" in response_text:
+            response_text = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL).group(1)
+        elif "```" in response_text:
+            response_text = re.search(r'```\s*(.*?)\s*```', response_text, re.DOTALL).group(1)
+        return json.loads(response_text)
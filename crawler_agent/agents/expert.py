@@ -2,14 +2,13 @@
 ExpertAgent implementation with multiple accuracy improvement techniques.
 """
 
-import json
 import re
 import os
 from typing import Dict, Any, List, Tuple
 from google.generativeai.types import Tool
 import google.generativeai as genai
 from crawler_agent.agents.base import BaseCrawlerAgent
-from crawler_agent.utils import create_function_declaration_from_config, proto_to_dict
+from crawler_agent.utils import create_function_declaration_from_config, load_config, proto_to_dict
 
 
 class ExpertAgent(BaseCrawlerAgent):
@@ -130,7 +129,7 @@ class ExpertAgent(BaseCrawlerAgent):
                 html_content=html_content
             )
 
-            response = model.generate_content(prompt)
+            response = self._generate_content(model, prompt)
 
             if response.candidates and response.candidates[0].content.parts:
                 for part in response.candidates[0].content.parts:
@@ -310,14 +309,21 @@ class ExpertAgent(BaseCrawlerAgent):
         Returns:
             Dict: Flattened dictionary
         """
-        items = []
-        for k, v in data.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key, sep=sep).items())
+        # Walk nested dicts with an explicit stack of item iterators (depth-first,
+        # same key order as recursion) and write straight into a single result dict
+        result = {}
+        stack = [(parent_key, iter(data.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    stack.append((new_key, iter(v.items())))
+                    break
+                result[new_key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
+                stack.pop()
+        return result
 
     def _unflatten_dict(self, data: Dict, sep: str = '.') -> Dict:
         """
@@ -431,12 +437,12 @@ class ExpertAgent(BaseCrawlerAgent):
 
         return final_result
 
-    def process_html(self, html_file_path: str, config_file_path: str):
+    def process_html_content(self, html_content: str, config_file_path: str):
         """
         Process HTML content with improved advanced techniques.
 
         Args:
-            html_file_path (str): Path to the HTML file to process
+            html_content (str): The HTML to process
             config_file_path (str): Path to the configuration file
 
         Returns:
@@ -445,12 +451,8 @@ class ExpertAgent(BaseCrawlerAgent):
         if self.debug_mode:
             print("🚀 Starting Improved Expert HTML Processing...")
         
-        # Load configuration and HTML
-        with open(config_file_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        # Load configuration
+        config = load_config(config_file_path)
         
         # Step 1: Clean HTML efficiently (remove noise without losing content)
         cleaned_html = self._clean_html_efficiently(html_content)
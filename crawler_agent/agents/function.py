@@ -2,11 +2,10 @@
 FunctionAgent implementation for structured data extraction from HTML using function calling.
 """
 
-import json
 from google.generativeai.types import Tool
 import google.generativeai as genai
 from crawler_agent.agents.base import BaseCrawlerAgent
-from crawler_agent.utils import create_function_declaration_from_config
+from crawler_agent.utils import create_function_declaration_from_config, load_config
 
 
 class FunctionAgent(BaseCrawlerAgent):
@@ -15,23 +14,19 @@ class FunctionAgent(BaseCrawlerAgent):
     using Google's Generative AI with dynamic function declarations and tool calling.
     """
     
-    def process_html(self, html_file_path: str, config_file_path: str):
+    def process_html_content(self, html_content: str, config_file_path: str):
         """
         Process HTML content and extract structured data based on configuration.
         
         Args:
-            html_file_path (str): Path to the HTML file to process
+            html_content (str): The HTML to process
             config_file_path (str): Path to the configuration file
             
         Returns:
             Structured data extracted from the HTML
         """
         # Load configuration from JSON file
-        with open(config_file_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        config = load_config(config_file_path)
 
         # Create dynamic function declaration from config
         function_declaration = create_function_declaration_from_config(config)
@@ -54,7 +49,7 @@ class FunctionAgent(BaseCrawlerAgent):
         prompt = f"Use the function `{config['function_name']}` to return the {config['object_description']} from the following HTML. " \
                  f"Only use the function.\n\n\n {html_content}"
         
-        response = model.generate_content(prompt)
+        response = self._generate_content(model, prompt)
 
         function_call = response.candidates[0].content.parts[0].function_call
         return function_call.args
@@ -8,6 +8,15 @@ import json
 from typing import Dict, List, Tuple
 from datetime import datetime
 
+try:
+    from crawler_agent.scoring import (
+        AGENT_NAMES, aggregate_agent_scores, combine_project_scores, load_validation_file, score_validation_files
+    )
+except ImportError:  # run as a script from crawler_agent/
+    from scoring import (
+        AGENT_NAMES, aggregate_agent_scores, combine_project_scores, load_validation_file, score_validation_files
+    )
+
 
 def find_validation_files():
     """Find all three-agent validation files in the validation directory."""
@@ -17,20 +26,15 @@ def find_validation_files():
         print(f"❌ Validation directory not found: {validation_dir}")
         return []
 
-    validation_files = []
-    for filename in os.listdir(validation_dir):
-        if filename.endswith("_validation.json"):
-            filepath = os.path.join(validation_dir, filename)
-            validation_files.append(filepath)
-
-    return validation_files
+    with os.scandir(validation_dir) as entries:
+        return [entry.path for entry in entries
+                if entry.name.endswith("_validation.json") and entry.is_file()]
 
 
 def load_validation_data(file_path: str) -> Dict:
     """Load validation data from a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_validation_file(file_path)
     except Exception as e:
         print(f"❌ Error loading {file_path}: {e}")
         return {}
@@ -38,101 +42,7 @@ def load_validation_data(file_path: str) -> Dict:
 
 def calculate_agent_scores(validation_data: List[Dict]) -> Tuple[Dict, List[Dict]]:
     """Calculate scores for all three agents across all projects."""
-
-    # Initialize agent statistics
-    agent_stats = {
-        "basic_agent": {
-            "correct": 0,
-            "incorrect": 0,
-            "skipped": 0,
-            "projects": [],
-            "processing_time_sum": 0.0,
-            "processing_time_count": 0
-        },
-        "function_agent": {
-            "correct": 0,
-            "incorrect": 0,
-            "skipped": 0,
-            "projects": [],
-            "processing_time_sum": 0.0,
-            "processing_time_count": 0
-        },
-        "expert_agent": {
-            "correct": 0,
-            "incorrect": 0,
-            "skipped": 0,
-            "projects": [],
-            "processing_time_sum": 0.0,
-            "processing_time_count": 0
-        }
-    }
-
-    project_details = []
-
-    for data in validation_data:
-        if not data:
-            continue
-
-        project_name = data.get("project_name", "unknown")
-
-        # Project-level details
-        project_field_details = {
-            "project_name": project_name,
-            "validation_date": data.get("validation_date", ""),
-            "agents": {}
-        }
-
-        # Try to load comparison file to fetch processing times
-        comparison_data = None
-        comparison_file = os.path.join("results", "comparison", f"{project_name}_comparison.json")
-        if os.path.exists(comparison_file):
-            try:
-                with open(comparison_file, 'r', encoding='utf-8') as cf:
-                    comparison_data = json.load(cf)
-            except Exception:
-                comparison_data = None
-
-        # Process each agent
-        for agent_key in ["basic_agent", "function_agent", "expert_agent"]:
-            if agent_key in data:
-                agent_data = data[agent_key]
-
-                # Add to overall stats
-                agent_stats[agent_key]["correct"] += agent_data.get("correct", 0)
-                agent_stats[agent_key]["incorrect"] += agent_data.get("incorrect", 0)
-                agent_stats[agent_key]["skipped"] += agent_data.get("skipped", 0)
-                agent_stats[agent_key]["projects"].append(project_name)
-
-                # Calculate project-level accuracy
-                correct = agent_data.get("correct", 0)
-                incorrect = agent_data.get("incorrect", 0)
-                skipped = agent_data.get("skipped", 0)
-                evaluated = correct + incorrect
-
-                accuracy = (correct / evaluated * 100) if evaluated > 0 else 0
-
-                project_field_details["agents"][agent_key] = {
-                    "correct": correct,
-                    "incorrect": incorrect,
-                    "skipped": skipped,
-                    "evaluated": evaluated,
-                    "accuracy": round(accuracy, 1)
-                }
-
-                # Attach processing time from comparison if available and update aggregates
-                if comparison_data and agent_key in comparison_data:
-                    try:
-                        processing_time = comparison_data[agent_key].get("processing_time")
-                        if isinstance(processing_time, (int, float)):
-                            project_field_details["agents"][agent_key]["processing_time"] = round(processing_time, 3)
-                            agent_stats[agent_key]["processing_time_sum"] += float(processing_time)
-                            agent_stats[agent_key]["processing_time_count"] += 1
-                    except Exception:
-                        pass
-
-        project_details.append(project_field_details)
-
-    return agent_stats, project_details
+    return aggregate_agent_scores(validation_data, with_confidence=False)
 
 
 def print_detailed_report(agent_stats: Dict, project_details: List[Dict]):
@@ -141,19 +51,12 @@ def print_detailed_report(agent_stats: Dict, project_details: List[Dict]):
     print("🏆 THREE-AGENT SCORING REPORT")
     print("=" * 60)
 
-    # Overall scores
-    agent_names = {
-        "basic_agent": "Basic Agent",
-        "function_agent": "Function Agent",
-        "expert_agent": "Expert Agent"
-    }
-
     print("\n📊 OVERALL PERFORMANCE")
     print("-" * 40)
 
     overall_scores = {}
 
-    for agent_key, agent_name in agent_names.items():
+    for agent_key, agent_name in AGENT_NAMES.items():
         stats = agent_stats[agent_key]
         total_correct = stats["correct"]
         total_incorrect = stats["incorrect"]
@@ -188,7 +91,7 @@ def print_detailed_report(agent_stats: Dict, project_details: List[Dict]):
         sorted_agents = sorted(overall_scores.items(), key=lambda x: x[1], reverse=True)
 
         for i, (agent_key, score) in enumerate(sorted_agents, 1):
-            agent_name = agent_names[agent_key]
+            agent_name = AGENT_NAMES[agent_key]
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
             print(f"   {medal} {i}. {agent_name}: {score:.1f}%")
 
@@ -201,7 +104,7 @@ def print_detailed_report(agent_stats: Dict, project_details: List[Dict]):
             project_name = project["project_name"]
             print(f"\n📁 {project_name}:")
 
-            for agent_key, agent_name in agent_names.items():
+            for agent_key, agent_name in AGENT_NAMES.items():
                 if agent_key in project["agents"]:
                     agent_data = project["agents"][agent_key]
                     accuracy = agent_data["accuracy"]
@@ -216,13 +119,7 @@ def save_scoring_report(agent_stats: Dict, project_details: List[Dict]):
 
     # Calculate final scores
     final_scores = {}
-    agent_names = {
-        "basic_agent": "Basic Agent",
-        "function_agent": "Function Agent",
-        "expert_agent": "Expert Agent"
-    }
-
-    for agent_key, agent_name in agent_names.items():
+    for agent_key, agent_name in AGENT_NAMES.items():
         stats = agent_stats[agent_key]
         total_correct = stats["correct"]
         total_incorrect = stats["incorrect"]
@@ -262,6 +159,7 @@ def save_scoring_report(agent_stats: Dict, project_details: List[Dict]):
     }
 
     # Save to file
+    os.makedirs("results", exist_ok=True)
     report_file = "results/scoring_report.json"
     with open(report_file, 'w', encoding='utf-8') as f:
         json.dump(report_data, f, indent=2, ensure_ascii=False)
@@ -285,22 +183,18 @@ def main():
 
     print(f"📁 Found {len(validation_files)} validation files")
 
-    # Load all validation data
-    all_validation_data = []
-    for file_path in validation_files:
-        data = load_validation_data(file_path)
-        if data:
-            all_validation_data.append(data)
-            project_name = data.get("project_name", os.path.basename(file_path))
-            print(f"   ✅ Loaded: {project_name}")
+    # Load all validation data (unchanged files are served from the score cache)
+    scored_projects = score_validation_files(validation_files, with_confidence=False)
+    for project_field_details, _ in scored_projects:
+        print(f"   ✅ Loaded: {project_field_details['project_name']}")
 
-    if not all_validation_data:
+    if not scored_projects:
         print("❌ No valid validation data found.")
         return
 
     # Calculate scores
     print(f"\n🔄 Calculating scores...")
-    agent_stats, project_details = calculate_agent_scores(all_validation_data)
+    agent_stats, project_details = combine_project_scores(scored_projects, with_confidence=False)
 
     # Print detailed report
     print_detailed_report(agent_stats, project_details)
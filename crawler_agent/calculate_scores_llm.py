@@ -9,6 +9,15 @@ import json
 from typing import Dict, List, Tuple
 from datetime import datetime
 
+try:
+    from crawler_agent.scoring import (
+        AGENT_NAMES, aggregate_agent_scores, combine_project_scores, load_validation_file, score_validation_files
+    )
+except ImportError:  # run as a script from crawler_agent/
+    from scoring import (
+        AGENT_NAMES, aggregate_agent_scores, combine_project_scores, load_validation_file, score_validation_files
+    )
+
 
 def find_llm_validation_files():
     """Find all LLM validation files in the llm_validation directory."""
@@ -19,20 +28,15 @@ def find_llm_validation_files():
         print("💡 Run LLM evaluation first: python llm_judge.py")
         return []
 
-    validation_files = []
-    for filename in os.listdir(llm_validation_dir):
-        if filename.endswith("_llm_validation.json"):
-            filepath = os.path.join(llm_validation_dir, filename)
-            validation_files.append(filepath)
-
-    return validation_files
+    with os.scandir(llm_validation_dir) as entries:
+        return [entry.path for entry in entries
+                if entry.name.endswith("_llm_validation.json") and entry.is_file()]
 
 
 def load_llm_validation_data(file_path: str) -> Dict:
     """Load LLM validation data from a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_validation_file(file_path)
     except Exception as e:
         print(f"❌ Error loading {file_path}: {e}")
         return {}
@@ -40,92 +44,7 @@ def load_llm_validation_data(file_path: str) -> Dict:
 
 def calculate_llm_agent_scores(validation_data: List[Dict]) -> Tuple[Dict, List[Dict]]:
     """Calculate scores for all three agents across all projects based on LLM evaluations."""
-
-    # Initialize agent statistics
-    agent_stats = {
-        "basic_agent": {
-            "correct": 0, 
-            "incorrect": 0, 
-            "projects": [],
-            "total_confidence": 0.0,
-            "evaluated_fields": 0
-        },
-        "function_agent": {
-            "correct": 0, 
-            "incorrect": 0, 
-            "projects": [],
-            "total_confidence": 0.0,
-            "evaluated_fields": 0
-        },
-        "expert_agent": {
-            "correct": 0, 
-            "incorrect": 0, 
-            "projects": [],
-            "total_confidence": 0.0,
-            "evaluated_fields": 0
-        }
-    }
-
-    project_details = []
-
-    for data in validation_data:
-        if not data:
-            continue
-
-        project_name = data.get("project_name", "unknown")
-        llm_model = data.get("llm_model", "unknown")
-
-        # Project-level details
-        project_field_details = {
-            "project_name": project_name,
-            "evaluation_date": data.get("evaluation_date", ""),
-            "llm_model": llm_model,
-            "agents": {}
-        }
-
-        # Process each agent
-        for agent_key in ["basic_agent", "function_agent", "expert_agent"]:
-            if agent_key in data:
-                agent_data = data[agent_key]
-
-                # Add to overall stats
-                agent_stats[agent_key]["correct"] += agent_data.get("correct", 0)
-                agent_stats[agent_key]["incorrect"] += agent_data.get("incorrect", 0)
-                agent_stats[agent_key]["total_confidence"] += agent_data.get("total_confidence", 0.0)
-                agent_stats[agent_key]["projects"].append(project_name)
-
-                # Count evaluated fields for this agent
-                evaluated_fields = agent_data.get("correct", 0) + agent_data.get("incorrect", 0)
-                agent_stats[agent_key]["evaluated_fields"] += evaluated_fields
-
-                # Calculate project-level accuracy
-                correct = agent_data.get("correct", 0)
-                incorrect = agent_data.get("incorrect", 0)
-                total = correct + incorrect
-                avg_confidence = agent_data.get("average_confidence", 0.0)
-
-                accuracy = (correct / total * 100) if total > 0 else 0
-
-                project_field_details["agents"][agent_key] = {
-                    "correct": correct,
-                    "incorrect": incorrect,
-                    "evaluated": total,
-                    "accuracy": round(accuracy, 1),
-                    "average_confidence": avg_confidence
-                }
-
-        project_details.append(project_field_details)
-
-    # Calculate overall average confidence for each agent
-    for agent_key in agent_stats:
-        total_fields = agent_stats[agent_key]["evaluated_fields"]
-        if total_fields > 0:
-            overall_avg_confidence = agent_stats[agent_key]["total_confidence"] / total_fields
-            agent_stats[agent_key]["overall_average_confidence"] = round(overall_avg_confidence, 3)
-        else:
-            agent_stats[agent_key]["overall_average_confidence"] = 0.0
-
-    return agent_stats, project_details
+    return aggregate_agent_scores(validation_data, with_confidence=True)
 
 
 def print_llm_detailed_report(agent_stats: Dict, project_details: List[Dict]):
@@ -134,13 +53,6 @@ def print_llm_detailed_report(agent_stats: Dict, project_details: List[Dict]):
     print("🤖 LLM-BASED THREE-AGENT SCORING REPORT")
     print("=" * 60)
 
-    # Overall scores
-    agent_names = {
-        "basic_agent": "Basic Agent",
-        "function_agent": "Function Agent",
-        "expert_agent": "Expert Agent"
-    }
-
     print("\n📊 OVERALL PERFORMANCE (LLM Evaluation)")
     print("-" * 40)
 
@@ -148,7 +60,7 @@ def print_llm_detailed_report(agent_stats: Dict, project_details: List[Dict]):
     llm_model = project_details[0].get("llm_model", "unknown") if project_details else "unknown"
     print(f"🧠 LLM Model: {llm_model}")
 
-    for agent_key, agent_name in agent_names.items():
+    for agent_key, agent_name in AGENT_NAMES.items():
         stats = agent_stats[agent_key]
         total_correct = stats["correct"]
         total_incorrect = stats["incorrect"]
@@ -177,7 +89,7 @@ def print_llm_detailed_report(agent_stats: Dict, project_details: List[Dict]):
         sorted_agents = sorted(overall_scores.items(), key=lambda x: x[1], reverse=True)
 
         for i, (agent_key, score) in enumerate(sorted_agents, 1):
-            agent_name = agent_names[agent_key]
+            agent_name = AGENT_NAMES[agent_key]
             medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉"
             print(f"   {medal} {i}. {agent_name}: {score:.1f}%")
 
@@ -190,7 +102,7 @@ def print_llm_detailed_report(agent_stats: Dict, project_details: List[Dict]):
             project_name = project["project_name"]
             print(f"\n📁 {project_name}:")
 
-            for agent_key, agent_name in agent_names.items():
+            for agent_key, agent_name in AGENT_NAMES.items():
                 if agent_key in project["agents"]:
                     agent_data = project["agents"][agent_key]
                     accuracy = agent_data["accuracy"]
@@ -206,13 +118,7 @@ def save_llm_scoring_report(agent_stats: Dict, project_details: List[Dict]):
 
     # Calculate final scores
     final_scores = {}
-    agent_names = {
-        "basic_agent": "Basic Agent",
-        "function_agent": "Function Agent",
-        "expert_agent": "Expert Agent"
-    }
-
-    for agent_key, agent_name in agent_names.items():
+    for agent_key, agent_name in AGENT_NAMES.items():
         stats = agent_stats[agent_key]
         total_correct = stats["correct"]
         total_incorrect = stats["incorrect"]
@@ -256,6 +162,7 @@ def save_llm_scoring_report(agent_stats: Dict, project_details: List[Dict]):
     }
 
     # Save to file
+    os.makedirs("results", exist_ok=True)
     report_file = "results/scoring_report_llm.json"
     with open(report_file, 'w', encoding='utf-8') as f:
         json.dump(report_data, f, indent=2, ensure_ascii=False)
@@ -287,13 +194,7 @@ def compare_with_human_validation():
         print(f"\n📊 HUMAN vs LLM VALIDATION COMPARISON")
         print("-" * 50)
         
-        agent_names = {
-            "basic_agent": "Basic Agent",
-            "function_agent": "Function Agent", 
-            "expert_agent": "Expert Agent"
-        }
-        
-        for agent_key, agent_name in agent_names.items():
+        for agent_key, agent_name in AGENT_NAMES.items():
             if agent_key in human_data.get("overall_scores", {}) and agent_key in llm_data.get("overall_scores", {}):
                 human_acc = human_data["overall_scores"][agent_key]["accuracy"]
                 llm_acc = llm_data["overall_scores"][agent_key]["accuracy"]
@@ -309,8 +210,8 @@ def compare_with_human_validation():
         llm_best = llm_data.get("summary", {}).get("best_agent", "unknown")
         
         print(f"\n🏆 Best Agent Comparison:")
-        print(f"   👤 Human: {agent_names.get(human_best, human_best)}")
-        print(f"   🧠 LLM: {agent_names.get(llm_best, llm_best)}")
+        print(f"   👤 Human: {AGENT_NAMES.get(human_best, human_best)}")
+        print(f"   🧠 LLM: {AGENT_NAMES.get(llm_best, llm_best)}")
         print(f"   🎯 Agreement: {'✅ Yes' if human_best == llm_best else '❌ No'}")
         
     except Exception as e:
@@ -333,22 +234,18 @@ def main():
 
     print(f"📁 Found {len(validation_files)} LLM validation files")
 
-    # Load all LLM validation data
-    all_validation_data = []
-    for file_path in validation_files:
-        data = load_llm_validation_data(file_path)
-        if data:
-            all_validation_data.append(data)
-            project_name = data.get("project_name", os.path.basename(file_path))
-            print(f"   ✅ Loaded: {project_name}")
+    # Load all LLM validation data (unchanged files are served from the score cache)
+    scored_projects = score_validation_files(validation_files, with_confidence=True)
+    for project_field_details, _ in scored_projects:
+        print(f"   ✅ Loaded: {project_field_details['project_name']}")
 
-    if not all_validation_data:
+    if not scored_projects:
         print("❌ No valid LLM validation data found.")
         return
 
     # Calculate LLM-based scores
     print(f"\n🔄 Calculating LLM-based scores...")
-    agent_stats, project_details = calculate_llm_agent_scores(all_validation_data)
+    agent_stats, project_details = combine_project_scores(scored_projects, with_confidence=True)
 
     # Print detailed report
     print_llm_detailed_report(agent_stats, project_details)
@@ -1,15 +1,146 @@
 import os
-import json
-from vertexai.preview import tokenization
+import sys
+import hashlib
+import marshal
+from concurrent.futures import ProcessPoolExecutor
+import sentencepiece as spm
 from datetime import datetime
 
 from crawler_agent.agents import ExpertAgent
+from crawler_agent.utils import json_bytes
+
+
+# Local SentencePiece model used for counting. Vertex AI tokenizes
+# gemini-1.5-flash-002 with this same Gemma model, so counts match it offline:
+# https://raw.githubusercontent.com/google/gemma_pytorch/33b652c465537c6158f9a472ea5700e5e770ad3f/tokenizer/tokenizer.model
+TOKENIZER_MODEL_FILE = os.getenv("TOKENIZER_MODEL_FILE", "configs/tokenizer.model")
+SINGLE_SAMPLES_DIR = "single_samples"
+CLEANED_HTML_CACHE_DIR = "results/.cleaned_html_cache"
+PROGRESS_FLUSH_EVERY = 20  # projects per batched progress write
+
+# Per-process tokenizer, HTML cleaner and cleaned-HTML cache directory, set up once by _init_worker
+_tokenizer = None
+_expert_agent = None
+_cleaned_cache_dir = None
+
+
+def count_tokens_batch(tokenizer, texts):
+    """Count tokens for each text (str or utf-8 bytes) with a single batched SentencePiece encode."""
+    return [len(token_ids) for token_ids in tokenizer.encode(list(texts))]
+
+
+def _init_worker():
+    """Load the tokenizer and HTML cleaner once per worker process."""
+    global _tokenizer, _expert_agent, _cleaned_cache_dir
+    _tokenizer = spm.SentencePieceProcessor(model_file=TOKENIZER_MODEL_FILE)
+    _expert_agent = ExpertAgent(api_key="123")
+    _expert_agent.debug_mode = False  # keep worker output from interleaving
+
+    # Cached output is only valid for the cleaner that produced it, so entries live
+    # under a hash of its code and any edit to the cleaner starts a fresh cache
+    cleaner_code = marshal.dumps(ExpertAgent._clean_html_efficiently.__code__)
+    _cleaned_cache_dir = os.path.join(CLEANED_HTML_CACHE_DIR, hashlib.blake2b(cleaner_code, digest_size=8).hexdigest())
+    os.makedirs(_cleaned_cache_dir, exist_ok=True)
+
+
+def _clean_html_cached(html_bytes):
+    """
+    Clean raw HTML, reusing the cleaned copy on disk when the same HTML was cleaned before.
+
+    Returns:
+        Tuple of (cleaned HTML as utf-8 bytes, whether it came from the cache)
+    """
+    key = hashlib.blake2b(html_bytes, digest_size=16).hexdigest()
+    cache_file = os.path.join(_cleaned_cache_dir, f"{key}.html")
+
+    try:
+        with open(cache_file, 'rb') as f:
+            return f.read(), True
+    except FileNotFoundError:
+        pass
+
+    cleaned_html = _expert_agent._clean_html_efficiently(html_bytes.decode('utf-8')).encode('utf-8')
+
+    # Write then rename so a concurrent reader never sees a partial file
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(cleaned_html)
+    os.replace(tmp_file, cache_file)
+    return cleaned_html, False
+
+
+def _process_project(project_name):
+    """
+    Clean and tokenize one project's HTML. Runs in a worker process, so errors are returned.
+
+    Returns:
+        Tuple of (project details or None, error message or None)
+    """
+    try:
+        html_file = os.path.join(SINGLE_SAMPLES_DIR, f"{project_name}.html")
+        with open(html_file, 'rb') as f:
+            html_bytes = f.read()
+
+        # Both versions are tokenized from their utf-8 bytes, so SentencePiece
+        # doesn't re-encode decoded copies
+        cleaned_html_bytes, cache_hit = _clean_html_cached(html_bytes)
+
+        # Count tokens for basic HTML and expert cleaned HTML together
+        basic_token_count, expert_token_count = count_tokens_batch(
+            _tokenizer, [html_bytes, cleaned_html_bytes]
+        )
+
+        # Calculate token reduction
+        token_reduction = basic_token_count - expert_token_count
+        reduction_percentage = (token_reduction / basic_token_count * 100) if basic_token_count > 0 else 0
+
+        return {
+            "project_name": project_name,
+            "basic_token_count": basic_token_count,
+            "expert_token_count": expert_token_count,
+            "token_reduction": token_reduction,
+            "reduction_percentage": round(reduction_percentage, 2),
+            "cache_hit": cache_hit
+        }, None
+
+    except Exception as e:
+        return None, str(e)
+
+
+def _flush_progress(progress_lines):
+    """Write buffered progress lines to stdout in one call and clear the buffer."""
+    if progress_lines:
+        sys.stdout.write("\n".join(progress_lines) + "\n")
+        sys.stdout.flush()
+        progress_lines.clear()
+
+
+def save_report_streaming(report_data, result_file, stream_key="project_details"):
+    """
+    Save a report as JSON, writing the (potentially long) stream_key list one entry at a time.
+
+    The summary keys are written indented as before; each streamed entry is
+    written compactly on its own line instead of being serialized as part of
+    one large indented document. The report is still built in memory first,
+    since its summary depends on every entry.
+    """
+    with open(result_file, 'wb') as f:
+        f.write(b"{")
+        for key, value in report_data.items():
+            if key != stream_key:
+                # Nest the value's own indentation one level under the report object
+                f.write(b"\n  " + json_bytes(key) + b": " + json_bytes(value).replace(b"\n", b"\n  ") + b",")
+        f.write(b"\n  " + json_bytes(stream_key) + b": [")
+        for i, entry in enumerate(report_data.get(stream_key, [])):
+            f.write(b",\n    " if i else b"\n    ")
+            f.write(json_bytes(entry, indent=False))
+        f.write(b"\n  ]\n}")
 
 
 def compare_token_count():
     """Compare token counts between basic HTML and expert cleaned HTML for all projects."""
     
-    single_samples_dir = "single_samples"
+    single_samples_dir = SINGLE_SAMPLES_DIR
     result_file = "results/token_comparison.json"
     
     # Create results directory if it doesn't exist
@@ -19,12 +150,15 @@ def compare_token_count():
         print(f"❌ Directory not found: {single_samples_dir}")
         return
     
+    if not os.path.exists(TOKENIZER_MODEL_FILE):
+        print(f"❌ Tokenizer model not found: {TOKENIZER_MODEL_FILE}")
+        print("💡 Download the Gemma tokenizer.model or set TOKENIZER_MODEL_FILE")
+        return
+    
     # Find all HTML files and extract project names
-    project_names = []
-    for filename in os.listdir(single_samples_dir):
-        if filename.endswith('.html'):
-            project_name = filename[:-5]  # Remove .html extension
-            project_names.append(project_name)
+    with os.scandir(single_samples_dir) as entries:
+        project_names = [entry.name[:-5] for entry in entries  # Remove .html extension
+                         if entry.name.endswith('.html') and entry.is_file()]
     
     if not project_names:
         print(f"❌ No HTML files found in {single_samples_dir}")
@@ -35,85 +169,45 @@ def compare_token_count():
     print(f"📁 Found {len(project_names)} projects for token count comparison")
     print("🔄 Starting token count analysis...")
     
-    # Initialize token count statistics
-    token_stats = {
-        "basic_agent": {
-            "total_tokens": 0,
-            "project_count": 0,
-            "projects": []
-        },
-        "expert_agent": {
-            "total_tokens": 0,
-            "project_count": 0,
-            "projects": []
-        }
-    }
-    
     project_details = []
+    progress_lines = []  # per-project output, written in batches
     
-    # Process each project
-    for i, project_name in enumerate(project_names, 1):
-        print(f"  📋 Processing {i}/{len(project_names)}: {project_name}")
+    # One processing timestamp for the whole run
+    run_ts = datetime.now().isoformat()
+    
+    # Clean and tokenize projects in parallel; each worker loads the tokenizer once.
+    # Workers also read their own HTML, so file I/O already overlaps across processes
+    # and raw pages are never pickled from the main process to a worker
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker) as executor:
+        results = executor.map(_process_project, project_names, chunksize=4)
         
-        try:
-            html_file = os.path.join(single_samples_dir, f"{project_name}.html")
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            model_name = "gemini-1.5-flash-002"
-            tokenizer = tokenization.get_tokenizer_for_model(model_name)
-            
-            # Count tokens for basic HTML
-            basic_token_count = tokenizer.count_tokens(html_content).total_tokens
+        for i, (project_name, (project_data, error)) in enumerate(zip(project_names, results), 1):
+            progress_lines.append(f"  📋 Processed {i}/{len(project_names)}: {project_name}")
             
-            # Count tokens for expert cleaned HTML
-            cleaned_html_content = ExpertAgent(api_key="123")._clean_html_efficiently(html_content)
-            expert_token_count = tokenizer.count_tokens(cleaned_html_content).total_tokens
+            if error:
+                progress_lines.append(f"    ❌ Error processing {project_name}: {error}")
+                _flush_progress(progress_lines)  # show errors right away
+                continue
             
-            # Calculate token reduction
-            token_reduction = basic_token_count - expert_token_count
-            reduction_percentage = (token_reduction / basic_token_count * 100) if basic_token_count > 0 else 0
-            
-            # Store project details
-            project_data = {
-                "project_name": project_name,
-                "basic_token_count": basic_token_count,
-                "expert_token_count": expert_token_count,
-                "token_reduction": token_reduction,
-                "reduction_percentage": round(reduction_percentage, 2),
-                "processing_date": datetime.now().isoformat()
-            }
+            project_data["processing_date"] = run_ts
             project_details.append(project_data)
             
-            # Update overall statistics
-            token_stats["basic_agent"]["total_tokens"] += basic_token_count
-            token_stats["basic_agent"]["project_count"] += 1
-            token_stats["basic_agent"]["projects"].append({
-                "name": project_name,
-                "token_count": basic_token_count
-            })
-            
-            token_stats["expert_agent"]["total_tokens"] += expert_token_count
-            token_stats["expert_agent"]["project_count"] += 1
-            token_stats["expert_agent"]["projects"].append({
-                "name": project_name,
-                "token_count": expert_token_count
-            })
-            
-            print(f"    ✅ Basic: {basic_token_count:,} tokens | Expert: {expert_token_count:,} tokens | Reduction: {reduction_percentage:.1f}%")
-            
-        except Exception as e:
-            print(f"    ❌ Error processing {project_name}: {e}")
-            continue
-    
-    # Calculate overall statistics
-    if token_stats["basic_agent"]["project_count"] > 0:
-        basic_mean = token_stats["basic_agent"]["total_tokens"] / token_stats["basic_agent"]["project_count"]
-        token_stats["basic_agent"]["mean_tokens"] = round(basic_mean, 2)
+            progress_lines.append(f"    ✅ Basic: {project_data['basic_token_count']:,} tokens | Expert: {project_data['expert_token_count']:,} tokens | Reduction: {project_data['reduction_percentage']:.1f}%")
+            if i % PROGRESS_FLUSH_EVERY == 0:
+                _flush_progress(progress_lines)
+        
+        _flush_progress(progress_lines)
     
-    if token_stats["expert_agent"]["project_count"] > 0:
-        expert_mean = token_stats["expert_agent"]["total_tokens"] / token_stats["expert_agent"]["project_count"]
-        token_stats["expert_agent"]["mean_tokens"] = round(expert_mean, 2)
+    # Calculate overall statistics in one pass over the collected project details
+    project_count = len(project_details)
+    token_stats = {}
+    for agent_key, count_key in (("basic_agent", "basic_token_count"), ("expert_agent", "expert_token_count")):
+        total_tokens = sum(project[count_key] for project in project_details)
+        token_stats[agent_key] = {
+            "total_tokens": total_tokens,
+            "project_count": project_count,
+            "mean_tokens": round(total_tokens / project_count, 2) if project_count else 0
+        }
     
     # Calculate overall token reduction
     total_reduction = token_stats["basic_agent"]["total_tokens"] - token_stats["expert_agent"]["total_tokens"]
@@ -134,23 +228,20 @@ def compare_token_count():
         "agent_statistics": {
             "basic_agent": {
                 "total_tokens": token_stats["basic_agent"]["total_tokens"],
-                "mean_tokens": token_stats["basic_agent"].get("mean_tokens", 0),
-                "project_count": token_stats["basic_agent"]["project_count"],
-                "projects": token_stats["basic_agent"]["projects"]
+                "mean_tokens": token_stats["basic_agent"]["mean_tokens"],
+                "project_count": token_stats["basic_agent"]["project_count"]
             },
             "expert_agent": {
                 "total_tokens": token_stats["expert_agent"]["total_tokens"],
-                "mean_tokens": token_stats["expert_agent"].get("mean_tokens", 0),
-                "project_count": token_stats["expert_agent"]["project_count"],
-                "projects": token_stats["expert_agent"]["projects"]
+                "mean_tokens": token_stats["expert_agent"]["mean_tokens"],
+                "project_count": token_stats["expert_agent"]["project_count"]
             }
         },
         "project_details": project_details
     }
     
     # Save report to file
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump(report_data, f, indent=2, ensure_ascii=False)
+    save_report_streaming(report_data, result_file)
     
     # Print summary
     print(f"\n{'='*60}")
@@ -158,13 +249,14 @@ def compare_token_count():
     print(f"{'='*60}")
     print(f"📁 Total projects analyzed: {len(project_names)}")
     print(f"✅ Successful projects: {len(project_details)}")
+    print(f"♻️ Cleaned HTML reused from cache: {sum(p['cache_hit'] for p in project_details)}")
     print(f"\n🔢 OVERALL TOKEN COUNTS:")
     print(f"   📄 Basic Agent (raw HTML): {token_stats['basic_agent']['total_tokens']:,} tokens")
     print(f"   🧹 Expert Agent (cleaned): {token_stats['expert_agent']['total_tokens']:,} tokens")
     print(f"   💾 Total reduction: {total_reduction:,} tokens ({overall_reduction_percentage:.1f}%)")
     print(f"\n📊 MEAN TOKENS PER PROJECT:")
-    print(f"   📄 Basic Agent: {token_stats['basic_agent'].get('mean_tokens', 0):,.0f} tokens")
-    print(f"   🧹 Expert Agent: {token_stats['expert_agent'].get('mean_tokens', 0):,.0f} tokens")
+    print(f"   📄 Basic Agent: {token_stats['basic_agent']['mean_tokens']:,.0f} tokens")
+    print(f"   🧹 Expert Agent: {token_stats['expert_agent']['mean_tokens']:,.0f} tokens")
     print(f"\n💾 Detailed report saved to: {result_file}")
     
     return report_data
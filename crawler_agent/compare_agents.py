@@ -4,12 +4,30 @@ Simple comparison script for Basic, Function, and Expert crawler agents.
 """
 
 import os
-import json
 import time
+import asyncio
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dotenv import load_dotenv
 from crawler_agent.agents.basic import BasicAgent
 from crawler_agent.agents.function import FunctionAgent
 from crawler_agent.agents.expert import ExpertAgent
+from crawler_agent.agents.base import set_rate_limit_processes, throttle_wait_seconds
+from crawler_agent.utils import (
+    AGENT_CACHE_DIR, agent_cache_enabled, agent_cache_file, dump_json, dump_json_atomic, load_cached_result,
+    store_cached_result
+)
+
+# Projects compared at the same time; each project already runs its three agents concurrently
+MAX_PARALLEL_PROJECTS = 4
+
+# Per-process (basic, function, expert) agents, set up once by _init_worker
+_agents = None
+
+# Banner lines, built once
+AGENT_BANNER = "=" * 50
+PROJECT_BANNER = "🔄" * 60
+FINISH_BANNER = "🏁" * 60
 
 
 def create_results_directory():
@@ -19,39 +37,61 @@ def create_results_directory():
         "results/basic",
         "results/function",
         "results/expert",
-        "results/comparison"
+        "results/comparison",
+        AGENT_CACHE_DIR
     ]
 
     for directory in directories:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
             print(f"Created directory: {directory}")
 
 
-def test_agent(agent, agent_name, input_file, config_file, output_file):
-    """Test a single agent and return results."""
-    print(f"\n{'='*50}")
-    print(f"🧪 Testing {agent_name}")
-    print(f"{'='*50}")
+def verbose_output():
+    """Whether to print per-agent and per-project progress; set COMPARE_VERBOSE=0 for only results and errors."""
+    return os.getenv("COMPARE_VERBOSE", "1") != "0"
 
-    start_time = time.time()
 
-    try:
-        agent.process_and_save(input_file, config_file, output_file)
+def test_agent(agent, agent_name, input_file, config_file, output_file, cache_file=None):
+    """Test a single agent and return results, reusing a cached result for unchanged inputs."""
+    # One print call so banners of agents running side by side don't interleave
+    if verbose_output():
+        print(f"\n{AGENT_BANNER}\n🧪 Testing {agent_name}\n{AGENT_BANNER}")
+
+    cached = load_cached_result(cache_file) if cache_file else None
+    if cached is not None:
+        dump_json(cached["data"], output_file)
+        # Report the time of the original run so cached projects stay comparable
+        print(f"♻️ {agent_name} reused cached result ({cached['processing_time']:.2f} seconds when run)")
+        return {
+            "agent_name": agent_name,
+            "success": True,
+            "processing_time": cached["processing_time"],
+            "output_file": output_file,
+            "cached": True
+        }
+
+    # Time spent waiting on the rate limiters isn't the agent's, so it is left out
+    start_time = time.perf_counter()
+    throttle_start = throttle_wait_seconds()
 
-        end_time = time.time()
-        processing_time = end_time - start_time
+    try:
+        # The returned data tells whether anything was saved, without re-reading the file
+        saved_data = agent.process_and_save(input_file, config_file, output_file)
 
-        if os.path.exists(output_file):
-            with open(output_file, 'r', encoding='utf-8') as f:
-                saved_data = json.load(f)
+        end_time = time.perf_counter()
+        processing_time = end_time - start_time - (throttle_wait_seconds() - throttle_start)
 
+        if saved_data is not None:
             print(f"✅ {agent_name} completed in {processing_time:.2f} seconds")
+            if cache_file:
+                store_cached_result(cache_file, processing_time, saved_data)
             return {
                 "agent_name": agent_name,
                 "success": True,
                 "processing_time": processing_time,
-                "data": saved_data
+                "output_file": output_file,
+                "cached": False
             }
         else:
             print(f"❌ {agent_name} failed - no output file created")
@@ -59,38 +99,73 @@ def test_agent(agent, agent_name, input_file, config_file, output_file):
                 "agent_name": agent_name,
                 "success": False,
                 "processing_time": processing_time,
-                "data": None
+                "output_file": None,
+                "cached": False
             }
 
     except Exception as e:
-        end_time = time.time()
-        processing_time = end_time - start_time
+        end_time = time.perf_counter()
+        processing_time = end_time - start_time - (throttle_wait_seconds() - throttle_start)
         print(f"❌ {agent_name} failed after {processing_time:.2f} seconds: {e}")
         return {
             "agent_name": agent_name,
             "success": False,
             "processing_time": processing_time,
-            "data": None
+            "output_file": None,
+            "cached": False
         }
 
 
-def compare_agents(project_name):
-    """Main function to test all three agents."""
+async def run_agents_concurrently(agent_jobs):
+    """
+    Run test_agent for several agents at once.
+
+    Agent calls are I/O-bound on the Gemini API, so each runs in its own thread.
+
+    Args:
+        agent_jobs: List of (agent, agent_name, input_file, config_file, output_file, cache_file) tuples
+
+    Returns:
+        List of test_agent results in the same order as agent_jobs
+    """
+    return await asyncio.gather(*(asyncio.to_thread(test_agent, *job) for job in agent_jobs))
+
+
+def _init_worker(api_key, workers=1):
+    """
+    Create the agents once per worker process so they are reused across projects.
+
+    Args:
+        api_key (str): The API key for Google Generative AI
+        workers (int): Number of worker processes; each gets an equal share of the rate limits
+    """
+    global _agents
+    set_rate_limit_processes(workers)
+    print("\n🔧 Initializing agents...")
+    _agents = (
+        BasicAgent(api_key=api_key),
+        FunctionAgent(api_key=api_key),
+        ExpertAgent(api_key=api_key)
+    )
+
+
+def compare_agents(project_name, agents):
+    """
+    Main function to test all three agents.
+
+    Args:
+        project_name (str): Name of the project to compare
+        agents: Tuple of (basic_agent, function_agent, expert_agent) to test
+
+    Returns:
+        The saved comparison data, or None if the project was skipped
+    """
     print("🚀 Starting Three-Agent Comparison Test")
     comparison_output = f"results/comparison/{project_name}_comparison.json"
     if os.path.exists(comparison_output):
         print(f"Comparison file already exists. Skipping {project_name} comparison")
         return
 
-    # Load environment variables
-    load_dotenv()
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY environment variable is not set.")
-
-    # Create results directory
-    create_results_directory()
-
     # Configuration
     html_file = f"single_samples/{project_name}.html"
     config_file = "configs/single_project_config.json"
@@ -110,21 +185,30 @@ def compare_agents(project_name):
     function_output = f"results/function/{project_name}_function.json"
     expert_output = f"results/expert/{project_name}_expert.json"
 
-    # Initialize agents
-    print("\n🔧 Initializing agents...")
-    basic_agent = BasicAgent(api_key=api_key)
-    function_agent = FunctionAgent(api_key=api_key)
-    expert_agent = ExpertAgent(api_key=api_key)
-
-    # Test all agents
-    basic_result = test_agent(basic_agent, "Basic Agent", html_file, config_file, basic_output)
-    function_result = test_agent(function_agent, "Function Agent", html_file, config_file, function_output)
-    expert_result = test_agent(expert_agent, "Expert Agent", html_file, config_file, expert_output)
+    basic_agent, function_agent, expert_agent = agents
+
+    # Read the inputs once to key the agent result cache
+    basic_cache = function_cache = expert_cache = None
+    if agent_cache_enabled():
+        with open(html_file, 'rb') as f:
+            html_bytes = f.read()
+        with open(config_file, 'rb') as f:
+            config_bytes = f.read()
+        basic_cache = agent_cache_file(basic_agent, html_bytes, config_bytes)
+        function_cache = agent_cache_file(function_agent, html_bytes, config_bytes)
+        expert_cache = agent_cache_file(expert_agent, html_bytes, config_bytes)
+
+    # Test all agents concurrently
+    basic_result, function_result, expert_result = asyncio.run(run_agents_concurrently([
+        (basic_agent, "Basic Agent", html_file, config_file, basic_output, basic_cache),
+        (function_agent, "Function Agent", html_file, config_file, function_output, function_cache),
+        (expert_agent, "Expert Agent", html_file, config_file, expert_output, expert_cache)
+    ]))
 
     # Summary
-    print(f"\n{'='*50}")
+    print(f"\n{AGENT_BANNER}")
     print("📊 COMPARISON SUMMARY")
-    print(f"{'='*50}")
+    print(AGENT_BANNER)
 
     agents = [basic_result, function_result, expert_result]
     successful_agents = [a for a in agents if a["success"]]
@@ -133,9 +217,9 @@ def compare_agents(project_name):
     for agent in successful_agents:
         print(f"   • {agent['agent_name']}: {agent['processing_time']:.2f}s")
 
+    # Find fastest
+    fastest = min(successful_agents, key=itemgetter("processing_time"), default=None)
     if len(successful_agents) > 1:
-        # Find fastest
-        fastest = min(successful_agents, key=lambda x: x["processing_time"])
         print(f"\n🏆 Fastest: {fastest['agent_name']} ({fastest['processing_time']:.2f}s)")
 
     # Save comparison results
@@ -146,12 +230,11 @@ def compare_agents(project_name):
         "summary": {
             "successful_count": len(successful_agents),
             "total_count": 3,
-            "fastest_agent": fastest["agent_name"] if successful_agents else None
+            "fastest_agent": fastest["agent_name"] if fastest else None
         }
     }
 
-    with open(comparison_output, 'w', encoding='utf-8') as f:
-        json.dump(comparison_data, f, indent=2, ensure_ascii=False)
+    dump_json_atomic(comparison_data, comparison_output)
 
     print(f"\n💾 Results saved:")
     print(f"   📁 Basic: {basic_output}")
@@ -161,73 +244,153 @@ def compare_agents(project_name):
 
     print(f"\n🏁 Three-Agent Comparison Complete!")
 
+    return comparison_data
+
+
+def _safe_compare(project_name):
+    """
+    Run compare_agents for one project in a worker process, returning its status instead of raising.
+
+    Args:
+        project_name (str): Name of the project to compare
+
+    Returns:
+        Tuple of (dict with the project name, status and error message if it failed,
+        dict of processing time per successful agent)
+    """
+    try:
+        comparison_data = compare_agents(project_name, _agents)
+        agent_times = {}
+        if comparison_data:
+            for agent_key in ("basic_agent", "function_agent", "expert_agent"):
+                agent_result = comparison_data[agent_key]
+                if agent_result["success"]:
+                    agent_times[agent_result["agent_name"]] = agent_result["processing_time"]
+        return {"project": project_name, "status": "success"}, agent_times
+    except Exception as e:
+        print(f"❌ Failed to process {project_name}: {e}")
+        return {"project": project_name, "status": "failed", "error": str(e)}, {}
+
+
+def summarize_agent_times(agent_times):
+    """
+    Summarize processing times collected per agent across a batch.
+
+    Args:
+        agent_times: Dict mapping agent name to its list of processing times
+
+    Returns:
+        Dict mapping agent name to run count and mean/min/max processing time
+    """
+    return {
+        agent_name: {
+            "runs": len(times),
+            "mean_time": sum(times) / len(times),
+            "min_time": min(times),
+            "max_time": max(times)
+        }
+        for agent_name, times in agent_times.items()
+    }
+
 
 def compare_all_projects():
     """Compare all three agents for all projects in single_samples folder."""
     print("🚀 Starting Batch Comparison for All Projects")
     print("=" * 60)
     
+    # Load environment variables once for the whole batch
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set.")
+    
     # Get all project names from single_samples folder
     single_samples_dir = "single_samples"
     if not os.path.exists(single_samples_dir):
         print(f"❌ Directory not found: {single_samples_dir}")
         return
     
-    # Find all HTML files and extract project names
-    project_names = []
-    for filename in os.listdir(single_samples_dir):
-        if filename.endswith('.html'):
-            project_name = filename[:-5]  # Remove .html extension
-            project_names.append(project_name)
+    # Find all HTML files and extract project names, sorted alphabetically for consistent processing
+    with os.scandir(single_samples_dir) as entries:
+        project_names = sorted(entry.name[:-5] for entry in entries  # Remove .html extension
+                               if entry.name.endswith('.html') and entry.is_file())
     
     if not project_names:
         print(f"❌ No HTML files found in {single_samples_dir}")
         return
     
-    project_names.sort()  # Sort alphabetically for consistent processing
-    
     print(f"📁 Found {len(project_names)} projects:")
     for i, project_name in enumerate(project_names, 1):
         print(f"   {i}. {project_name}")
     
+    # Create results directories once for the whole batch
+    create_results_directory()
+    
+    # Projects that already have a comparison file are skipped, as compare_agents would
+    with os.scandir("results/comparison") as entries:
+        completed_files = {entry.name for entry in entries}
+    pending_projects = [project_name for project_name in project_names
+                        if f"{project_name}_comparison.json" not in completed_files]
+    
+    if not pending_projects:
+        print(f"\n✅ All {len(project_names)} projects already have comparison files - nothing to do")
+        return
+    
     print(f"\n⏱️ Starting batch processing...")
     
-    # Track overall results
-    overall_results = []
-    successful_projects = 0
+    # Track overall results; skipped projects count as successful, as before
+    results_by_project = {
+        project_name: {"project": project_name, "status": "success"}
+        for project_name in project_names if f"{project_name}_comparison.json" in completed_files
+    }
+    successful_projects = len(results_by_project)
     failed_projects = 0
+    agent_times = {}  # agent name -> processing times of projects run in this batch
     
-    start_time = time.time()
+    if results_by_project:
+        print(f"⏭️ Skipping {len(results_by_project)} projects with existing comparison files")
     
-    # Process each project
-    for i, project_name in enumerate(project_names, 1):
-        print(f"\n{'🔄' * 60}")
-        print(f"📋 Processing Project {i}/{len(project_names)}: {project_name}")
-        print(f"{'🔄' * 60}")
+    start_time = time.perf_counter()
+    
+    # Compare projects in parallel; each project writes only its own output files.
+    # Projects are submitted one at a time rather than in map() chunks: each takes
+    # seconds of API calls, so dispatch overhead is negligible and single-project
+    # tasks keep slow projects from holding up a whole chunk
+    max_workers = max(1, min(MAX_PARALLEL_PROJECTS, len(pending_projects)))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(api_key, max_workers)) as executor:
+        futures = [executor.submit(_safe_compare, project_name) for project_name in pending_projects]
         
-        try:
-            # Run comparison for this project
-            compare_agents(project_name)
-            successful_projects += 1
-            overall_results.append({"project": project_name, "status": "success"})
+        for i, future in enumerate(as_completed(futures), 1):
+            result, project_agent_times = future.result()
+            results_by_project[result["project"]] = result
+            for agent_name, processing_time in project_agent_times.items():
+                agent_times.setdefault(agent_name, []).append(processing_time)
             
-        except Exception as e:
-            print(f"❌ Failed to process {project_name}: {e}")
-            failed_projects += 1
-            overall_results.append({"project": project_name, "status": "failed", "error": str(e)})
-        
-        # Progress indicator
-        remaining = len(project_names) - i
-        if remaining > 0:
-            print(f"\n⏳ {remaining} projects remaining...")
+            if result["status"] == "success":
+                successful_projects += 1
+            else:
+                failed_projects += 1
+            
+            if verbose_output():
+                print(f"\n{PROJECT_BANNER}\n📋 Finished Project {i}/{len(pending_projects)}: "
+                      f"{result['project']} ({result['status']})\n{PROJECT_BANNER}")
+                
+                # Progress indicator
+                remaining = len(pending_projects) - i
+                if remaining > 0:
+                    print(f"\n⏳ {remaining} projects remaining...")
+    
+    # Report projects in alphabetical order regardless of completion order
+    overall_results = [results_by_project[project_name] for project_name in project_names]
     
     # Final summary
-    end_time = time.time()
+    end_time = time.perf_counter()
     total_time = end_time - start_time
     
-    print(f"\n{'🏁' * 60}")
+    print(f"\n{FINISH_BANNER}")
     print("📊 BATCH PROCESSING COMPLETE")
-    print(f"{'🏁' * 60}")
+    print(FINISH_BANNER)
     
     print(f"✅ Successful projects: {successful_projects}")
     print(f"❌ Failed projects: {failed_projects}")
@@ -243,12 +406,12 @@ def compare_all_projects():
         "failed_projects": failed_projects,
         "total_time_seconds": total_time,
         "average_time_per_project": total_time / len(project_names),
+        "agent_timing": summarize_agent_times(agent_times),
         "project_results": overall_results
     }
     
     batch_summary_file = "results/comparison/batch_summary.json"
-    with open(batch_summary_file, 'w', encoding='utf-8') as f:
-        json.dump(batch_summary, f, indent=2, ensure_ascii=False)
+    dump_json(batch_summary, batch_summary_file)
     
     print(f"\n💾 Batch summary saved to: {batch_summary_file}")
     
@@ -5,15 +5,262 @@ Automatically validates extracted fields against original HTML content.
 """
 
 import os
+import re
 import json
 import time
+import random
+import asyncio
+import hashlib
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from bs4 import BeautifulSoup
 
 from dotenv import load_dotenv
 
+try:
+    from crawler_agent.utils import RequestRateLimiter, dump_json_atomic, json_bytes, load_json, loads_json
+except ImportError:  # run as a script from crawler_agent/
+    from utils import RequestRateLimiter, dump_json_atomic, json_bytes, load_json, loads_json
+
+try:
+    from lxml import etree as lxml_etree, html as lxml_html
+except ImportError:  # optional speedup, BeautifulSoup's pure-Python parser is used without it
+    lxml_html = lxml_etree = None
+
+# Cleaned page text given to the judge is cut to this many characters
+CLEAN_TEXT_MAX_CHARS = 3000
+
+# Large pages are first cleaned from this many leading HTML characters; the full page
+# is only parsed when that prefix doesn't yield CLEAN_TEXT_MAX_CHARS of text
+HTML_PREFIX_CHARS = 262144
+
+# Any run of whitespace in extracted page text, collapsed to a single space
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Prompts only carry the cleaned-text windows of this many characters that mention the
+# field or its extracted values, at most FOCUS_WINDOW_COUNT of them per field
+FOCUS_WINDOW_CHARS = 200
+FOCUS_WINDOW_COUNT = 5
+
+# API errors worth retrying: rate limits/quota (429) and an overloaded model (503)
+RETRYABLE_API_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+
+# Default cap on judge requests per minute (Gemma's free tier allows 30); override with
+# LLM_JUDGE_RPM in the environment or .env, 0 disables the limit
+DEFAULT_REQUESTS_PER_MINUTE = 30
+
+# Retries of a rate-limited LLM call and the cap on the exponential backoff between them, in seconds
+LLM_MAX_RETRIES = 6
+LLM_MAX_BACKOFF = 64
+
+# Server hint on when to retry, e.g. "Please retry in 37.5s" or "retry_delay { seconds: 37 }"
+RETRY_HINT_PATTERN = re.compile(r'retry in ([\d.]+)\s*s|retry_delay\s*\{\s*seconds:\s*(\d+)')
+
+# Prompt for a field where all three agents extracted the same value
+IDENTICAL_PROMPT_TEMPLATE = """You are an expert data extraction evaluator. Your task is to determine if an extracted value is correct based on the source HTML content.
+ 
+ Field Name: {field_name}
+ Extracted Value: {display_value}
+ 
+ Source HTML Content (cleaned):
+ {clean_html}
+ 
+ Context: This is a crowdfunding project page in Persian/Farsi language.
+ {field_context}
+
+Your evaluation should consider:
+1. Is the extracted value present in the HTML content?
+2. Is it the correct value for this field type?
+3. Is the extraction accurate and complete?
+4. Are there any obvious errors or mismatches?
+
+Please respond with only a JSON object in this exact format:
+{{"decision": "CORRECT" or "INCORRECT", "confidence": <0.0-1.0>, "explanation": "<brief explanation of your decision>"}}
+
+Important: Be strict in your evaluation. Only mark as CORRECT if you are confident the extraction is accurate."""
+
+# Prompt for a field where the agents' values form 2-3 groups
+GROUPED_PROMPT_TEMPLATE = """You are an expert data extraction evaluator. Your task is to evaluate different groups of agents that extracted the same values and determine which groups are correct based on the source HTML content.
+ 
+ Field Name: {field_name}
+ 
+ Response Groups:
+ {group_descriptions}
+ 
+ Note: Agents within each group gave identical responses.
+ 
+ Source HTML Content (cleaned):
+ {clean_html}
+ 
+ Context: This is a crowdfunding project page in Persian/Farsi language.
+ {field_context}
+
+Your evaluation should consider:
+1. Are the extracted values present in the HTML content?
+2. Are they the correct values for this field type?
+3. Are the extractions accurate and complete?
+4. Are there any obvious errors or mismatches?
+
+Prefer the number values that have units instead of ones that do not.
+
+Please respond with only a JSON object in this exact format:
+{{"correct_groups": [<numbers of the groups that are correct, empty if all incorrect>], "confidence": <0.0-1.0>, "explanation": "<brief explanation of your decisions for each group>"}}
+
+Examples:
+- If groups 1 and 3 are correct: "correct_groups": [1, 3]
+- If only group 2 is correct: "correct_groups": [2]
+- If all groups are correct: "correct_groups": [1, 2, 3]
+- If none are correct: "correct_groups": []
+
+Important: Be strict in your evaluation. Only mark as CORRECT if you are confident the extraction is accurate."""
+
+# Prompt for several fields at once, answered with one FIELD_VERDICT_PATTERN line per field
+BATCH_PROMPT_TEMPLATE = """You are an expert data extraction evaluator. Your task is to evaluate several fields extracted from the same page. For each field, agents that extracted the same value are grouped together; determine which groups are correct based on the source HTML content.
+
+ Source HTML Content (cleaned):
+ {clean_html}
+
+ Context: This is a crowdfunding project page in Persian/Farsi language.
+
+ Fields to evaluate:
+ {field_descriptions}
+
+ Note: Agents within each group gave identical responses.
+
+Your evaluation should consider:
+1. Are the extracted values present in the HTML content?
+2. Are they the correct values for this field type?
+3. Are the extractions accurate and complete?
+4. Are there any obvious errors or mismatches?
+
+Prefer the number values that have units instead of ones that do not.
+
+Please respond with exactly one line per field in this exact format:
+FIELD <number>: CORRECT_GROUPS=<comma-separated list of correct group numbers, or none> CONFIDENCE=<0.0-1.0> EXPLANATION=<brief explanation>
+
+Examples:
+FIELD 1: CORRECT_GROUPS=1,3 CONFIDENCE=0.9 EXPLANATION=Groups 1 and 3 match the title on the page
+FIELD 2: CORRECT_GROUPS=none CONFIDENCE=0.8 EXPLANATION=The value does not appear on the page
+
+Important: Be strict in your evaluation. Only mark as CORRECT if you are confident the extraction is accurate."""
+
+# Response schemas of the single-field prompts, enforced server-side by models with JSON mode
+IDENTICAL_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decision": {"type": "string", "enum": ["CORRECT", "INCORRECT"]},
+        "confidence": {"type": "number"},
+        "explanation": {"type": "string"}
+    },
+    "required": ["decision", "confidence", "explanation"]
+}
+GROUPED_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "correct_groups": {"type": "array", "items": {"type": "integer"}},
+        "confidence": {"type": "number"},
+        "explanation": {"type": "string"}
+    },
+    "required": ["correct_groups", "confidence", "explanation"]
+}
+
+# Gemma models on the Gemini API reject JSON mode, so they only get the format in the prompt
+NO_JSON_MODE_MODEL_PREFIXES = ("gemma-",)
+
+# LLM verdicts keyed by a hash of the model, field, agents' values and cleaned page
+VERDICT_CACHE_DIR = "results/.llm_verdict_cache"
+
+# Maximum number of LLM prompts of one project in flight at the same time
+MAX_CONCURRENT_FIELDS = 10
+
+# Maximum number of projects evaluated at the same time; they share the judge's rate limiter
+MAX_CONCURRENT_PROJECTS = 4
+
+# Number of fields judged together in one prompt, so the page content is sent once per batch
+FIELD_BATCH_SIZE = 8
+
+# Keys of the first line of a project's NDJSON file; every later line is one field's evaluation
+NDJSON_HEADER_KEYS = ("project_name", "evaluation_date", "llm_model")
+
+# One verdict line of a multi-field prompt response
+FIELD_VERDICT_PATTERN = re.compile(
+    r'^\s*FIELD\s+(\d+):\s*CORRECT_GROUPS=([^ ]+)\s+CONFIDENCE=([\d.]+)\s+EXPLANATION=(.*)$',
+    re.MULTILINE
+)
+
+
+def _display_and_normalize(value: any) -> Tuple[str, Optional[str]]:
+    """
+    Inspect an extracted value once, returning how to show it in a prompt and how to compare it.
+    
+    Args:
+        value: Value extracted by an agent
+    
+    Returns:
+        Tuple of (display value, normalized value); None and blank strings both normalize to None
+    """
+    if value is None:
+        return "NULL/NOT_FOUND", None
+    if isinstance(value, str):
+        stripped = value.strip()
+        if not stripped:
+            return "EMPTY_STRING", None
+        return value, stripped
+    text = str(value)
+    return text, text.strip()
+
+
+def _parse_confidence(value: any) -> float:
+    """Parse a confidence value from an LLM response, clamped to 0-1 (0.5 if missing or invalid)."""
+    try:
+        return max(0.0, min(1.0, float(value)))
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def _parse_json_verdict(response: Optional[str]) -> Dict:
+    """
+    Decode the JSON object of a single-field prompt response.
+    
+    Models without JSON mode may wrap the object in a ```json fence or a sentence,
+    so only the text from the first "{" to the last "}" is decoded.
+    
+    Args:
+        response: Raw LLM response text
+    
+    Returns:
+        The decoded object, or an empty dictionary if the response holds none
+    """
+    text = response or ""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return {}
+    try:
+        parsed = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a failed API call: the server's retry hint when it gives one,
+    otherwise exponential backoff. Random jitter keeps concurrent calls from retrying in lockstep.
+    
+    Args:
+        error: The retryable API error
+        attempt: Number of retries already made (0 for the first)
+    
+    Returns:
+        Delay in seconds
+    """
+    match = RETRY_HINT_PATTERN.search(str(error))
+    if match:
+        return float(match.group(1) or match.group(2)) + random.random()
+    return min(2 ** attempt + random.random(), LLM_MAX_BACKOFF)
+
 
 class GemmaLLMJudge:
     """LLM Judge using Google's Gemini API with free Gemma 3 model."""
@@ -32,11 +279,24 @@ class GemmaLLMJudge:
         # Load field descriptions from config
         self.field_config = self._load_field_config(config_file)
         
+        # Field context strings are the same for every project, so build them once
+        self._field_contexts = {
+            field_name: self._build_field_context_string(field_name, field_info)
+            for field_name, field_info in self.field_config.get("fields", {}).items()
+        }
+        
+        # Cleaned page text keyed by a hash of the raw HTML, so re-evaluating a page skips the parse
+        self._clean_html_cache = {}
+        
         # Configure Gemini API
         load_dotenv()
         api_key = os.getenv("GEMINI_API_KEY")
         genai.configure(api_key=api_key)
         
+        # Pace API calls to the quota; concurrent fields and retries all draw from the same bucket
+        requests_per_minute = int(os.getenv("LLM_JUDGE_RPM", DEFAULT_REQUESTS_PER_MINUTE))
+        self._rate_limiter = RequestRateLimiter(requests_per_minute) if requests_per_minute > 0 else None
+        
         # Initialize the model
         try:
             self.model = genai.GenerativeModel(model_name)
@@ -51,9 +311,7 @@ class GemmaLLMJudge:
         """Load field descriptions from the configuration file."""
         try:
             if os.path.exists(config_file):
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return config
+                return load_json(config_file)
             else:
                 print(f"⚠️ Config file not found: {config_file}, using defaults")
                 return {}
@@ -62,13 +320,14 @@ class GemmaLLMJudge:
             return {}
     
     def _get_field_context_string(self, field_name: str) -> str:
-        """Generate field context string for a specific field from config."""
-        fields = self.field_config.get("fields", {})
-        
-        if field_name not in fields:
+        """Get the field context string for a specific field from config."""
+        context = self._field_contexts.get(field_name)
+        if context is None:
             return f"Field: {field_name} (no specific description available)"
-        
-        field_info = fields[field_name]
+        return context
+    
+    def _build_field_context_string(self, field_name: str, field_info: Dict) -> str:
+        """Generate field context string for a field from its config entry."""
         description = field_info.get("description", "No description")
         field_type = field_info.get("type", "unknown")
         required = field_info.get("required", False)
@@ -81,46 +340,117 @@ class GemmaLLMJudge:
         
         return context
     
-    def _call_llm(self, prompt: str, max_tokens: int = 1000) -> str:
+    def _call_llm(self, prompt: str, max_tokens: int = 1000, response_schema: Optional[Dict] = None) -> str:
         """
         Call the Gemma model via Google Gemini API.
         
         Args:
             prompt: Input prompt for the model
             max_tokens: Maximum tokens to generate
+            response_schema: JSON schema the response must follow, for models that support JSON mode
             
         Returns:
-            Generated response text
+            Generated response text, or "" if the call failed
         """
-        try:
-            # Configure generation parameters
-            generation_config = genai.GenerationConfig(
-                max_output_tokens=max_tokens,
-                temperature=0.1,  # Low temperature for consistent evaluation
-                top_p=0.9,
-                top_k=40
-            )
+        # Configure generation parameters
+        json_mode = {}
+        if response_schema is not None and not self.model_name.startswith(NO_JSON_MODE_MODEL_PREFIXES):
+            json_mode = {"response_mime_type": "application/json", "response_schema": response_schema}
+        generation_config = genai.GenerationConfig(
+            max_output_tokens=max_tokens,
+            temperature=0.1,  # Low temperature for consistent evaluation
+            top_p=0.9,
+            top_k=40,
+            **json_mode
+        )
             
-            # Generate response
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config
-            )
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            try:
+                # Generate response
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config
+                )
             
-            return response.text.strip() if response.text else ""
+                return response.text.strip() if response.text else ""
             
-        except Exception as e:
-            print(f"❌ Error calling Gemini API: {e}")
-            # Rate limiting or quota exceeded
-            if "quota" in str(e).lower() or "rate" in str(e).lower():
-                print("💡 API quota exceeded. Waiting 60 seconds...")
-                time.sleep(60)
+            except RETRYABLE_API_ERRORS as e:
+                # Rate limiting, quota exceeded or overloaded model
+                if attempt == LLM_MAX_RETRIES:
+                    print(f"❌ Gemini API still unavailable after {LLM_MAX_RETRIES} retries: {e}")
+                    return ""
+                delay = _retry_delay(e, attempt)
+                print(f"💡 Gemini API busy ({type(e).__name__}). Retrying in {delay:.1f} seconds "
+                      f"({attempt + 1}/{LLM_MAX_RETRIES})...")
+                time.sleep(delay)
+            
+            except Exception as e:
+                print(f"❌ Error calling Gemini API: {e}")
                 return ""
-            return ""
     
+    async def _call_llm_async(self, prompt: str, max_tokens: int = 1000, response_schema: Optional[Dict] = None) -> str:
+        """
+        Call the model without blocking the event loop, so several fields can wait on the API at once.
+
+        Args:
+            prompt: Input prompt for the model
+            max_tokens: Maximum tokens to generate
+            response_schema: JSON schema the response must follow (see _call_llm)
+
+        Returns:
+            Generated response text
+        """
+        return await asyncio.to_thread(self._call_llm, prompt, max_tokens, response_schema)
+
     def clean_html_content(self, html_content: str) -> str:
-        """Extract and clean text content from HTML."""
+        """Extract and clean text content from HTML, reusing the result for HTML cleaned before."""
+        html_hash = hashlib.blake2b(html_content.encode('utf-8'), digest_size=16).digest()
+        if html_hash not in self._clean_html_cache:
+            self._clean_html_cache[html_hash] = self._clean_html_text(html_content)
+        return self._clean_html_cache[html_hash]
+    
+    def _clean_html_text(self, html_content: str) -> str:
+        """Parse HTML and return its visible text with collapsed whitespace, cut to CLEAN_TEXT_MAX_CHARS."""
         try:
+            text = None
+            if len(html_content) > HTML_PREFIX_CHARS:
+                # Only the start of the text is kept, so most of a large page needn't be parsed
+                text = self._extract_visible_text(html_content[:HTML_PREFIX_CHARS])
+            if text is None or len(text) <= CLEAN_TEXT_MAX_CHARS:
+                text = self._extract_visible_text(html_content)
+            
+            # Limit length to avoid token limits (Gemini free tier has limits)
+            if len(text) > CLEAN_TEXT_MAX_CHARS:
+                text = text[:CLEAN_TEXT_MAX_CHARS] + "..."
+            
+            return text
+        
+        except Exception as e:
+            print(f"❌ Error cleaning HTML: {e}")
+            return html_content[:CLEAN_TEXT_MAX_CHARS]
+    
+    def _extract_visible_text(self, html_content: str) -> str:
+        """Parse HTML and return its visible text with collapsed whitespace."""
+        tree = None
+        if lxml_html is not None:
+            # Build only lxml's C tree (no BeautifulSoup objects on top of it)
+            try:
+                tree = lxml_html.fromstring(html_content)
+            except (ValueError, lxml_etree.ParserError):
+                # An XML encoding declaration in a str, or a document without elements;
+                # BeautifulSoup's parser below handles both
+                pass
+        
+        if tree is not None:
+            # Remove script and style elements, keeping the text that follows them
+            for element in tree.xpath('//script|//style|//noscript'):
+                element.drop_tree()
+            
+            # Get text and clean it
+            text = tree.text_content()
+        else:
             soup = BeautifulSoup(html_content, 'html.parser')
             
             # Remove script and style elements
@@ -129,80 +459,93 @@ class GemmaLLMJudge:
             
             # Get text and clean it
             text = soup.get_text()
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # Limit length to avoid token limits (Gemini free tier has limits)
-            if len(text) > 3000:
-                text = text[:3000] + "..."
-            
-            return text
-            
-        except Exception as e:
-            print(f"❌ Error cleaning HTML: {e}")
-            return html_content[:3000]
+        
+        # Clean up whitespace
+        text = WHITESPACE_PATTERN.sub(' ', text).strip()
+        
+        return text
     
-    def evaluate_field_all_agents(self, field_name: str, basic_value: any, function_value: any, 
-                                 expert_value: any, html_content: str, project_context: str = "") -> Dict:
+    def _focus_html(self, clean_html: str, anchors: List[str], max_windows: int = FOCUS_WINDOW_COUNT) -> str:
+        """
+        Cut cleaned page text down to the parts relevant to a field.
+        
+        The text is split into FOCUS_WINDOW_CHARS windows, each scored by how often the
+        anchors occur in it (case-insensitively), and the best max_windows windows are kept
+        in page order, joined by "...". Windows that mention no anchor are always dropped.
+        
+        Args:
+            clean_html: Cleaned HTML content (see clean_html_content)
+            anchors: Field name and extracted values to look for
+            max_windows: Maximum number of windows to keep
+        
+        Returns:
+            The focused text, or clean_html unchanged if no anchor occurs in it
+        """
+        windows = [clean_html[i:i + FOCUS_WINDOW_CHARS] for i in range(0, len(clean_html), FOCUS_WINDOW_CHARS)]
+        
+        # Long values (e.g. descriptions) can't fit in one window, so look for their beginning;
+        # one- or two-character values (e.g. "1") would match nearly everywhere, so skip them
+        anchors = {anchor.strip().lower()[:FOCUS_WINDOW_CHARS // 2] for anchor in anchors}
+        anchors = [anchor for anchor in anchors if len(anchor) >= 3]
+        scores = [sum(window.lower().count(anchor) for anchor in anchors) for window in windows]
+        if not any(scores):
+            # Nothing to focus on (e.g. every agent found nothing); let the judge see the whole text
+            return clean_html
+        
+        best = sorted(range(len(windows)), key=lambda i: scores[i], reverse=True)[:max_windows]
+        return "...".join(windows[i] for i in sorted(best) if scores[i])
+    
+    def _focus_anchors(self, field_name: str, value_groups: Dict) -> List[str]:
+        """Anchors for _focus_html: the field name and every value an agent actually extracted."""
+        return [field_name] + [
+            group["normalized_value"] for group in value_groups.values() if group["normalized_value"] is not None
+        ]
+    
+    async def evaluate_field_all_agents(self, field_name: str, value_groups: Dict, clean_html: str,
+                                        project_context: str = "") -> Dict:
         """
         Evaluate all three agents' extractions for a single field simultaneously.
         Optimizes by grouping identical responses to reduce API calls.
         
         Args:
             field_name: Name of the field being evaluated
-            basic_value: Value extracted by basic agent
-            function_value: Value extracted by function agent
-            expert_value: Value extracted by expert agent
-            html_content: Original HTML content
+            value_groups: The agents' values grouped by _group_agent_values
+            clean_html: Cleaned HTML content (see clean_html_content)
             project_context: Additional context about the project
             
         Returns:
             Dictionary with evaluation results for all three agents
         """
+        cached_results = self._load_cached_verdict(field_name, value_groups, clean_html)
+        if cached_results is not None:
+            print(f"    ♻️ Reusing cached verdict for field '{field_name}'")
+            return cached_results
         
-        # Clean HTML content
-        clean_html = self.clean_html_content(html_content)
+        print(f"    📊 Found {len(value_groups)} unique response(s) for field '{field_name}'")
         
-        # Format extracted values for display
-        def format_value(value):
-            if value is None:
-                return "NULL/NOT_FOUND"
-            elif isinstance(value, str) and len(value.strip()) == 0:
-                return "EMPTY_STRING"
-            else:
-                return str(value)
-        
-        # Normalize values for comparison (handle None vs empty string consistently)
-        def normalize_value(value):
-            if value is None or (isinstance(value, str) and value.strip() == ""):
-                return None
-            elif isinstance(value, str):
-                return value.strip()
-            else:
-                return str(value).strip()
+        # If all three agents have identical responses, evaluate once
+        if len(value_groups) == 1:
+            return await self._evaluate_identical_responses(field_name, value_groups, clean_html)
         
-        basic_display = format_value(basic_value)
-        function_display = format_value(function_value)
-        expert_display = format_value(expert_value)
+        # If we have 2-3 different groups, use the optimized multi-group evaluation
+        return await self._evaluate_grouped_responses(field_name, value_groups, clean_html)
+    
+    def _group_agent_values(self, basic_value: Tuple, function_value: Tuple, expert_value: Tuple) -> Dict:
+        """
+        Group the three agents (numbered 1-3) by identical extracted values.
         
-        basic_normalized = normalize_value(basic_value)
-        function_normalized = normalize_value(function_value)
-        expert_normalized = normalize_value(expert_value)
+        Args:
+            basic_value: (display, normalized) pair of the basic agent's value, see _display_and_normalize
+            function_value: (display, normalized) pair of the function agent's value
+            expert_value: (display, normalized) pair of the expert agent's value
         
-        # Group agents by identical responses
+        Returns:
+            Dictionary mapping each distinct value to its agents, display value and normalized value
+        """
+        # Create groups of agents with identical values (agents 1-3: basic, function, expert)
         value_groups = {}
-        agent_mapping = {
-            1: ("basic", basic_normalized, basic_display),
-            2: ("function", function_normalized, function_display),
-            3: ("expert", expert_normalized, expert_display)
-        }
-        
-        # Create groups of agents with identical values
-        for agent_num, (agent_name, normalized_val, display_val) in agent_mapping.items():
-            value_key = str(normalized_val) if normalized_val is not None else "NULL"
+        for agent_num, (display_val, normalized_val) in enumerate((basic_value, function_value, expert_value), 1):
+            value_key = normalized_val if normalized_val is not None else "NULL"
             if value_key not in value_groups:
                 value_groups[value_key] = {
                     "agents": [],
@@ -211,24 +554,50 @@ class GemmaLLMJudge:
                 }
             value_groups[value_key]["agents"].append(agent_num)
         
-        print(f"    📊 Found {len(value_groups)} unique response(s) for field '{field_name}'")
+        return value_groups
+    
+    def _verdict_cache_file(self, field_name: str, value_groups: Dict, clean_html: str) -> str:
+        """
+        Get the cache file for the verdict on a field's agent groups for a page.
         
-        # If all three agents have identical responses, evaluate once
-        if len(value_groups) == 1:
-            return self._evaluate_identical_responses(field_name, value_groups, clean_html)
+        The key covers the model, the field and its config description, which agents
+        gave which value, and the cleaned page, so changing any of them starts a fresh entry.
         
-        # If we have 2-3 different groups, use the optimized multi-group evaluation
-        return self._evaluate_grouped_responses(field_name, value_groups, clean_html)
+        Returns:
+            str: Path of the cache file for this verdict
+        """
+        groups = [(group["agents"], group["display_value"]) for group in value_groups.values()]
+        key_hash = hashlib.blake2b(digest_size=16)
+        for part in (self.model_name, field_name, self._get_field_context_string(field_name), repr(groups), clean_html):
+            part = part.encode('utf-8')
+            # Length-prefix each part so different splits of the same bytes can't collide
+            key_hash.update(len(part).to_bytes(8, "little"))
+            key_hash.update(part)
+        return os.path.join(VERDICT_CACHE_DIR, f"{key_hash.hexdigest()}.json")
+    
+    def _load_cached_verdict(self, field_name: str, value_groups: Dict, clean_html: str) -> Optional[Dict]:
+        """Return the cached evaluation results for a field, or None if it was never judged."""
+        cache_file = self._verdict_cache_file(field_name, value_groups, clean_html)
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            return load_json(cache_file)
+        except ValueError:
+            # Unreadable entry (e.g. an interrupted write); judge the field again
+            return None
+    
+    def _save_cached_verdict(self, field_name: str, value_groups: Dict, clean_html: str, results: Dict):
+        """Cache the evaluation results of a field that the LLM actually judged."""
+        os.makedirs(VERDICT_CACHE_DIR, exist_ok=True)
+        dump_json_atomic(results, self._verdict_cache_file(field_name, value_groups, clean_html))
     
-    def _evaluate_identical_responses(self, field_name: str, value_groups: Dict, clean_html: str) -> Dict:
+    async def _evaluate_identical_responses(self, field_name: str, value_groups: Dict, clean_html: str) -> Dict:
         """
         Evaluate when all three agents have identical responses.
         Only makes one API call to evaluate the shared response.
         """
         # Get the single group (all agents have same response)
-        group = list(value_groups.values())[0]
-        agents = group["agents"]
-        display_value = group["display_value"]
+        display_value = next(iter(value_groups.values()))["display_value"]
         
         print(f"    🎯 All agents identical - evaluating once: '{display_value}'")
         
@@ -236,70 +605,27 @@ class GemmaLLMJudge:
         field_context = self._get_field_context_string(field_name)
         
         # Create single evaluation prompt
-        prompt = f"""You are an expert data extraction evaluator. Your task is to determine if an extracted value is correct based on the source HTML content.
- 
- Field Name: {field_name}
- Extracted Value: {display_value}
- 
- Source HTML Content (cleaned):
- {clean_html}
- 
- Context: This is a crowdfunding project page in Persian/Farsi language.
- {field_context}
-
-Your evaluation should consider:
-1. Is the extracted value present in the HTML content?
-2. Is it the correct value for this field type?
-3. Is the extraction accurate and complete?
-4. Are there any obvious errors or mismatches?
-
-Please respond in this exact format:
-DECISION: [CORRECT/INCORRECT]
-CONFIDENCE: [0.0-1.0]
-EXPLANATION: [Brief explanation of your decision]
-
-Important: Be strict in your evaluation. Only mark as CORRECT if you are confident the extraction is accurate."""
+        prompt = IDENTICAL_PROMPT_TEMPLATE.format(
+            field_name=field_name, display_value=display_value, field_context=field_context,
+            clean_html=self._focus_html(clean_html, self._focus_anchors(field_name, value_groups))
+        )
 
         try:
-            response = self._call_llm(prompt, max_tokens=500)
+            response = await self._call_llm_async(prompt, max_tokens=500, response_schema=IDENTICAL_RESPONSE_SCHEMA)
             
             # Parse LLM response
-            is_correct = False
-            confidence = 0.5
-            explanation = "Failed to parse LLM response"
-            
-            if response:
-                lines = response.strip().split('\n')
-                for line in lines:
-                    if line.startswith('DECISION:'):
-                        decision = line.split(':', 1)[1].strip().upper()
-                        is_correct = decision == 'CORRECT'
-                    elif line.startswith('CONFIDENCE:'):
-                        try:
-                            confidence = float(line.split(':', 1)[1].strip())
-                            confidence = max(0.0, min(1.0, confidence))
-                        except:
-                            confidence = 0.5
-                    elif line.startswith('EXPLANATION:'):
-                        explanation = line.split(':', 1)[1].strip()
+            verdict = _parse_json_verdict(response)
+            is_correct = str(verdict.get("decision", "")).upper() == "CORRECT"
             
             # Apply the same result to all agents since they had identical responses
-            correct_agents = agents if is_correct else []
+            results = self._group_verdict_results(
+                value_groups, [1] if is_correct else [], _parse_confidence(verdict.get("confidence")),
+                str(verdict.get("explanation", "Failed to parse LLM response"))
+            )
             
-            results = {
-                "basic_correct": 1 in correct_agents,
-                "function_correct": 2 in correct_agents,
-                "expert_correct": 3 in correct_agents,
-                "basic_explanation": explanation,
-                "function_explanation": explanation,
-                "expert_explanation": explanation,
-                "basic_confidence": confidence,
-                "function_confidence": confidence,
-                "expert_confidence": confidence,
-                "batch_evaluation": True,
-                "identical_responses": True,
-                "correct_agents": correct_agents
-            }
+            # Only a parsed verdict is cached; a failed parse is retried on the next run
+            if "decision" in verdict:
+                self._save_cached_verdict(field_name, value_groups, clean_html, results)
             
             return results
             
@@ -320,7 +646,7 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
                 "correct_agents": []
             }
     
-    def _evaluate_grouped_responses(self, field_name: str, value_groups: Dict, clean_html: str) -> Dict:
+    async def _evaluate_grouped_responses(self, field_name: str, value_groups: Dict, clean_html: str) -> Dict:
         """
         Evaluate when agents have 2-3 different responses.
         Groups identical responses to minimize redundant evaluation.
@@ -337,94 +663,33 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
         # Get field context from config for this specific field
         field_context = self._get_field_context_string(field_name)
         
-        prompt = f"""You are an expert data extraction evaluator. Your task is to evaluate different groups of agents that extracted the same values and determine which groups are correct based on the source HTML content.
- 
- Field Name: {field_name}
- 
- Response Groups:
- {chr(10).join(group_descriptions)}
- 
- Note: Agents within each group gave identical responses.
- 
- Source HTML Content (cleaned):
- {clean_html}
- 
- Context: This is a crowdfunding project page in Persian/Farsi language.
- {field_context}
-
-Your evaluation should consider:
-1. Are the extracted values present in the HTML content?
-2. Are they the correct values for this field type?
-3. Are the extractions accurate and complete?
-4. Are there any obvious errors or mismatches?
-
-Prefer the number values that have units instead of ones that do not.
-
-Please respond in this exact format:
-CORRECT_GROUPS: [comma-separated list of group numbers that are correct, or "none" if all incorrect]
-CONFIDENCE: [0.0-1.0]
-EXPLANATION: [Brief explanation of your decisions for each group]
-
-Examples:
-- If groups 1 and 3 are correct: "CORRECT_GROUPS: 1,3"
-- If only group 2 is correct: "CORRECT_GROUPS: 2"
-- If all groups are correct: "CORRECT_GROUPS: 1,2,3"
-- If none are correct: "CORRECT_GROUPS: none"
-
-Important: Be strict in your evaluation. Only mark as CORRECT if you are confident the extraction is accurate."""
+        prompt = GROUPED_PROMPT_TEMPLATE.format(
+            field_name=field_name, group_descriptions="\n".join(group_descriptions), field_context=field_context,
+            clean_html=self._focus_html(clean_html, self._focus_anchors(field_name, value_groups))
+        )
 
         try:
-            response = self._call_llm(prompt, max_tokens=700)
+            response = await self._call_llm_async(prompt, max_tokens=700, response_schema=GROUPED_RESPONSE_SCHEMA)
             
             # Parse LLM response
-            correct_groups = []
-            confidence = 0.5
-            explanation = "Failed to parse LLM response"
-            
-            if response:
-                lines = response.strip().split('\n')
-                for line in lines:
-                    if line.startswith('CORRECT_GROUPS:'):
-                        groups_str = line.split(':', 1)[1].strip().lower()
-                        if groups_str == "none":
-                            correct_groups = []
-                        else:
-                            try:
-                                group_nums = [int(x.strip()) for x in groups_str.split(',') if x.strip()]
-                                correct_groups = [num for num in group_nums if 1 <= num <= len(group_list)]
-                            except:
-                                correct_groups = []
-                    elif line.startswith('CONFIDENCE:'):
-                        try:
-                            confidence = float(line.split(':', 1)[1].strip())
-                            confidence = max(0.0, min(1.0, confidence))
-                        except:
-                            confidence = 0.5
-                    elif line.startswith('EXPLANATION:'):
-                        explanation = line.split(':', 1)[1].strip()
+            verdict = _parse_json_verdict(response)
+            groups = verdict.get("correct_groups")
+            parsed = isinstance(groups, list)
+            try:
+                correct_groups = [int(group_num) for group_num in groups] if parsed else []
+            except (TypeError, ValueError):
+                correct_groups = []
+                parsed = False
             
             # Convert group results back to individual agent results
-            correct_agents = []
-            for group_num in correct_groups:
-                if 1 <= group_num <= len(group_list):
-                    group_key = list(value_groups.keys())[group_num - 1]
-                    correct_agents.extend(value_groups[group_key]["agents"])
+            results = self._group_verdict_results(
+                value_groups, correct_groups, _parse_confidence(verdict.get("confidence")),
+                str(verdict.get("explanation", "Failed to parse LLM response"))
+            )
             
-            results = {
-                "basic_correct": 1 in correct_agents,
-                "function_correct": 2 in correct_agents,
-                "expert_correct": 3 in correct_agents,
-                "basic_explanation": explanation,
-                "function_explanation": explanation,
-                "expert_explanation": explanation,
-                "basic_confidence": confidence,
-                "function_confidence": confidence,
-                "expert_confidence": confidence,
-                "batch_evaluation": True,
-                "grouped_evaluation": True,
-                "correct_agents": correct_agents,
-                "response_groups": len(group_list)
-            }
+            # Only a parsed verdict is cached; a failed parse is retried on the next run
+            if parsed:
+                self._save_cached_verdict(field_name, value_groups, clean_html, results)
             
             return results
             
@@ -445,7 +710,199 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
                 "correct_agents": []
             }
     
-    def evaluate_project(self, project_name: str) -> Optional[Dict]:
+    async def evaluate_fields_batch(self, field_specs: List[Tuple], clean_html: str,
+                                    batch_size: int = FIELD_BATCH_SIZE,
+                                    on_results: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Evaluate many fields with one prompt per batch of fields instead of one prompt per field.
+        The cleaned page content dominates the prompt, so sending it once per batch cuts both
+        API calls and input tokens. Fields missing from a batch response are evaluated on their own.
+        
+        Args:
+            field_specs: List of (field_name, value_groups) tuples, see _group_agent_values
+            clean_html: Cleaned HTML content (see clean_html_content)
+            batch_size: Maximum number of fields per prompt
+            on_results: Called with each batch's field results as soon as they are available
+        
+        Returns:
+            Dictionary mapping each field name to its evaluation results for all three agents
+        """
+        # Reuse verdicts from earlier runs; only the remaining fields go to the LLM
+        field_results = {}
+        pending_specs = []
+        for field_name, value_groups in field_specs:
+            cached_results = self._load_cached_verdict(field_name, value_groups, clean_html)
+            if cached_results is not None:
+                field_results[field_name] = cached_results
+            else:
+                pending_specs.append((field_name, value_groups))
+        if field_results:
+            print(f"  ♻️ Reusing {len(field_results)} cached verdict(s)")
+            if on_results:
+                on_results(field_results)
+        
+        batches = [pending_specs[i:i + batch_size] for i in range(0, len(pending_specs), batch_size)]
+        if batches:
+            print(f"  📦 Judging {len(pending_specs)} fields in {len(batches)} prompt(s)")
+        
+        # Keep at most MAX_CONCURRENT_FIELDS prompts in flight
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FIELDS)
+        
+        async def evaluate_batch(batch):
+            async with semaphore:
+                batch_results = await self._evaluate_field_batch(batch, clean_html)
+            for field_name, value_groups in batch:
+                if field_name not in batch_results:
+                    print(f"    ⚠️ No verdict for field '{field_name}' in batch response, evaluating it alone")
+                    async with semaphore:
+                        batch_results[field_name] = await self.evaluate_field_all_agents(
+                            field_name, value_groups, clean_html
+                        )
+            if on_results:
+                on_results(batch_results)
+            return batch_results
+        
+        for batch_results in await asyncio.gather(*(evaluate_batch(batch) for batch in batches)):
+            field_results.update(batch_results)
+        return field_results
+    
+    async def _evaluate_field_batch(self, field_specs: List[Tuple], clean_html: str) -> Dict:
+        """
+        Evaluate a batch of fields with a single prompt.
+        
+        Args:
+            field_specs: List of (field_name, value_groups) tuples, see _group_agent_values
+            clean_html: Cleaned HTML content
+        
+        Returns:
+            Dictionary mapping field name to evaluation results for the fields the response covered
+        """
+        if len(field_specs) == 1:
+            field_name, value_groups = field_specs[0]
+            if len(value_groups) == 1:
+                return {field_name: await self._evaluate_identical_responses(field_name, value_groups, clean_html)}
+            return {field_name: await self._evaluate_grouped_responses(field_name, value_groups, clean_html)}
+        
+        fields = []
+        field_descriptions = []
+        anchors = []
+        for i, (field_name, value_groups) in enumerate(field_specs, 1):
+            fields.append((field_name, value_groups))
+            anchors.extend(self._focus_anchors(field_name, value_groups))
+            group_lines = [
+                f"Group {group_num} ({', '.join(f'Agent {num}' for num in group_info['agents'])}): {group_info['display_value']}"
+                for group_num, group_info in enumerate(value_groups.values(), 1)
+            ]
+            field_descriptions.append(
+                f"FIELD {i} (name={field_name})\n{self._get_field_context_string(field_name)}\n" + "\n".join(group_lines)
+            )
+        
+        # The page text is shared by the batch, so keep the windows relevant to any of its fields
+        focused_html = self._focus_html(clean_html, anchors, FOCUS_WINDOW_COUNT * len(field_specs))
+        prompt = BATCH_PROMPT_TEMPLATE.format(clean_html=focused_html, field_descriptions="\n".join(field_descriptions))
+
+        try:
+            response = await self._call_llm_async(prompt, max_tokens=200 * len(field_specs) + 300)
+        except Exception as e:
+            print(f"❌ Error during batch evaluation: {e}")
+            return {}
+        
+        results = {}
+        for match in FIELD_VERDICT_PATTERN.finditer(response or ""):
+            field_num = int(match.group(1))
+            if not 1 <= field_num <= len(fields):
+                continue
+            field_name, value_groups = fields[field_num - 1]
+            groups_str = match.group(2).strip().lower()
+            try:
+                correct_groups = [] if groups_str == "none" else [int(x) for x in groups_str.split(',') if x.strip()]
+                confidence = max(0.0, min(1.0, float(match.group(3))))
+            except ValueError:
+                # Leave the field out so it is evaluated on its own
+                continue
+            results[field_name] = self._group_verdict_results(
+                value_groups, correct_groups, confidence, match.group(4).strip()
+            )
+            self._save_cached_verdict(field_name, value_groups, clean_html, results[field_name])
+        return results
+    
+    def _group_verdict_results(self, value_groups: Dict, correct_groups: List[int], confidence: float,
+                               explanation: str) -> Dict:
+        """
+        Convert a verdict on response groups into per-agent evaluation results.
+        
+        Args:
+            value_groups: Agent groups as returned by _group_agent_values
+            correct_groups: 1-based numbers of the groups judged correct
+            confidence: Confidence of the verdict
+            explanation: Explanation of the verdict
+        
+        Returns:
+            Dictionary with evaluation results for all three agents
+        """
+        group_list = list(value_groups.values())
+        correct_agents = []
+        for group_num in correct_groups:
+            if 1 <= group_num <= len(group_list):
+                correct_agents.extend(group_list[group_num - 1]["agents"])
+        
+        results = {
+            "basic_correct": 1 in correct_agents,
+            "function_correct": 2 in correct_agents,
+            "expert_correct": 3 in correct_agents,
+            "basic_explanation": explanation,
+            "function_explanation": explanation,
+            "expert_explanation": explanation,
+            "basic_confidence": confidence,
+            "function_confidence": confidence,
+            "expert_confidence": confidence,
+            "batch_evaluation": True
+        }
+        if len(group_list) == 1:
+            results["identical_responses"] = True
+            results["correct_agents"] = correct_agents
+        else:
+            results["grouped_evaluation"] = True
+            results["correct_agents"] = correct_agents
+            results["response_groups"] = len(group_list)
+        return results
+    
+    def _read_html_file(self, html_file: str) -> Optional[str]:
+        """Read a project's HTML file, returning None if it can't be read."""
+        try:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            print(f"❌ Error reading HTML file: {e}")
+            return None
+    
+    def _load_agent_result(self, project_name: str, agent: str) -> Dict:
+        """
+        Load the project fields one agent extracted for a project.
+        
+        Args:
+            project_name: Name of the project
+            agent: Agent name (basic, function or expert)
+        
+        Returns:
+            Dictionary of extracted fields, empty if the result is missing or unreadable
+        """
+        result_file = f"results/{agent}/{project_name}_{agent}.json"
+        if not os.path.exists(result_file):
+            print(f"⚠️ No results found for {agent} agent")
+            return {}
+        try:
+            data = load_json(result_file)
+        except Exception as e:
+            print(f"❌ Error loading {agent} results: {e}")
+            return {}
+        
+        # Extract project fields
+        if isinstance(data, dict) and "project" in data:
+            return data["project"] if isinstance(data["project"], dict) else {}
+        return data
+    
+    async def evaluate_project(self, project_name: str) -> Optional[Dict]:
         """
         Evaluate all three agents' results for a project.
         
@@ -457,43 +914,20 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
         """
         print(f"\n🔍 LLM Evaluating project: {project_name}")
         
-        # Load HTML content
         html_file = f"single_samples/{project_name}.html"
         if not os.path.exists(html_file):
             print(f"❌ HTML file not found: {html_file}")
             return None
         
-        try:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-        except Exception as e:
-            print(f"❌ Error reading HTML file: {e}")
-            return None
-        
-        # Load agent results
+        # Load HTML content and agent results, reading the four files in parallel threads
         agents = ["basic", "function", "expert"]
-        agent_data = {}
-        
-        for agent in agents:
-            result_file = f"results/{agent}/{project_name}_{agent}.json"
-            if os.path.exists(result_file):
-                try:
-                    with open(result_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # Extract project fields
-                        if isinstance(data, dict) and "project" in data:
-                            if isinstance(data["project"], dict):
-                                agent_data[agent] = data["project"]
-                            else:
-                                agent_data[agent] = {}
-                        else:
-                            agent_data[agent] = data
-                except Exception as e:
-                    print(f"❌ Error loading {agent} results: {e}")
-                    agent_data[agent] = {}
-            else:
-                print(f"⚠️ No results found for {agent} agent")
-                agent_data[agent] = {}
+        html_content, *agent_results = await asyncio.gather(
+            asyncio.to_thread(self._read_html_file, html_file),
+            *(asyncio.to_thread(self._load_agent_result, project_name, agent) for agent in agents)
+        )
+        if html_content is None:
+            return None
+        agent_data = dict(zip(agents, agent_results))
         
         if not any(agent_data.values()):
             print(f"❌ No agent data found for project {project_name}")
@@ -512,62 +946,61 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
         print(f"📊 Evaluating {len(all_fields)} fields across {len([a for a in agents if agent_data.get(a)])} agents")
         
         # Evaluation results
-        evaluation_results = {
-            "project_name": project_name,
-            "evaluation_date": datetime.now().isoformat(),
-            "llm_model": self.model_name,
-            "basic_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
-            "function_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
-            "expert_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
-            "field_evaluations": {}
+        evaluation_results = _new_evaluation_results(project_name, datetime.now().isoformat(), self.model_name)
+        
+        # Clean the page once, off the event loop so other projects keep going; every field prompt reuses it
+        clean_html = await asyncio.to_thread(self.clean_html_content, html_content)
+        
+        # Display and normalize every agent's values once up front, then group them per field
+        field_names = sorted(all_fields)
+        missing_value = _display_and_normalize(None)
+        agent_values = {
+            agent: {field_name: _display_and_normalize(value) for field_name, value in agent_data[agent].items()}
+            for agent in agents
         }
+        field_specs = [
+            (field_name, self._group_agent_values(*(
+                agent_values[agent].get(field_name, missing_value) for agent in agents
+            )))
+            for field_name in field_names
+        ]
         
-        # Evaluate each field (batch evaluation for all agents at once)
-        for field_name in sorted(all_fields):
-            print(f"  📋 Evaluating field: {field_name}")
-            
-            # Get values for all three agents
-            basic_value = agent_data.get("basic", {}).get(field_name)
-            function_value = agent_data.get("function", {}).get(field_name)
-            expert_value = agent_data.get("expert", {}).get(field_name)
-            
-            field_results = {
-                "basic_value": basic_value,
-                "function_value": function_value,
-                "expert_value": expert_value,
-                "evaluations": {}
+        def field_evaluation(field_name, batch_results):
+            return {
+                "basic_value": agent_data.get("basic", {}).get(field_name),
+                "function_value": agent_data.get("function", {}).get(field_name),
+                "expert_value": agent_data.get("expert", {}).get(field_name),
+                "evaluations": batch_results
             }
-            
-            # Add delay to respect API rate limits (only one call per field now)
-            time.sleep(1)
-            
-            # Batch evaluate all three agents for this field
-            batch_results = self.evaluate_field_all_agents(
-                field_name, basic_value, function_value, expert_value, html_content, project_name
-            )
-            
-            # Store batch evaluation results
-            field_results["evaluations"] = batch_results
+        
+        # Stream each verdict to the project's NDJSON file as soon as it arrives, so an
+        # interrupted run keeps the fields judged so far (see rebuild_json_from_ndjson)
+        ndjson_file = llm_validation_ndjson_file(project_name)
+        create_llm_validation_directory()
+        with open(ndjson_file, 'wb') as f:
+            f.write(json_bytes({key: evaluation_results[key] for key in NDJSON_HEADER_KEYS}, indent=False) + b"\n")
+        
+        def append_field_evaluations(batch_results):
+            with open(ndjson_file, 'ab') as f:
+                for field_name, field_batch_results in batch_results.items():
+                    record = {"field": field_name, **field_evaluation(field_name, field_batch_results)}
+                    f.write(json_bytes(record, indent=False) + b"\n")
+        
+        # Evaluate the fields in batches (all agents at once per field, several fields per prompt)
+        all_batch_results = await self.evaluate_fields_batch(
+            field_specs, clean_html, on_results=append_field_evaluations
+        )
+
+        for field_name in field_names:
+            print(f"  📋 Evaluated field: {field_name}")
+            batch_results = all_batch_results[field_name]
+            field_results = field_evaluation(field_name, batch_results)
             
             # Update agent statistics
-            agents_info = [
-                ("basic", "basic_agent"),
-                ("function", "function_agent"), 
-                ("expert", "expert_agent")
-            ]
-            
-            for agent, agent_key in agents_info:
+            _record_field_evaluation(evaluation_results, field_name, field_results)
+            for agent in agents:
                 is_correct = batch_results[f"{agent}_correct"]
                 confidence = batch_results[f"{agent}_confidence"]
-                
-                # Update agent stats
-                if is_correct:
-                    evaluation_results[agent_key]["correct"] += 1
-                else:
-                    evaluation_results[agent_key]["incorrect"] += 1
-                
-                evaluation_results[agent_key]["total_confidence"] += confidence
-                
                 print(f"    {agent}: {'✅' if is_correct else '❌'} (conf: {confidence:.2f})")
             
             # Show optimization details and results
@@ -585,22 +1018,93 @@ Important: Be strict in your evaluation. Only mark as CORRECT if you are confide
                 print(f"    ✅ Result: {', '.join(correct_names)} correct")
             else:
                 print(f"    ❌ Result: All incorrect")
-            
-            evaluation_results["field_evaluations"][field_name] = field_results
-        
-        # Calculate average confidence for each agent
-        for agent in agents:
-            agent_key = f"{agent}_agent"
-            total_fields = evaluation_results[agent_key]["correct"] + evaluation_results[agent_key]["incorrect"]
-            if total_fields > 0:
-                avg_confidence = evaluation_results[agent_key]["total_confidence"] / total_fields
-                evaluation_results[agent_key]["average_confidence"] = round(avg_confidence, 3)
-            else:
-                evaluation_results[agent_key]["average_confidence"] = 0.0
         
+        _set_average_confidences(evaluation_results)
         return evaluation_results
 
 
+def _new_evaluation_results(project_name: str, evaluation_date: str, llm_model: str) -> Dict:
+    """Create an empty project evaluation, filled in by _record_field_evaluation."""
+    return {
+        "project_name": project_name,
+        "evaluation_date": evaluation_date,
+        "llm_model": llm_model,
+        "basic_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
+        "function_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
+        "expert_agent": {"correct": 0, "incorrect": 0, "total_confidence": 0.0},
+        "field_evaluations": {}
+    }
+
+
+def _record_field_evaluation(evaluation_results: Dict, field_name: str, field_results: Dict):
+    """Add a field's values and verdicts to a project evaluation and update each agent's stats."""
+    evaluations = field_results["evaluations"]
+    for agent in ["basic", "function", "expert"]:
+        stats = evaluation_results[f"{agent}_agent"]
+        if evaluations[f"{agent}_correct"]:
+            stats["correct"] += 1
+        else:
+            stats["incorrect"] += 1
+        stats["total_confidence"] += evaluations[f"{agent}_confidence"]
+    evaluation_results["field_evaluations"][field_name] = field_results
+        
+
+def _set_average_confidences(evaluation_results: Dict):
+    """Calculate average confidence for each agent."""
+    for agent in ["basic", "function", "expert"]:
+        stats = evaluation_results[f"{agent}_agent"]
+        total_fields = stats["correct"] + stats["incorrect"]
+        stats["average_confidence"] = round(stats["total_confidence"] / total_fields, 3) if total_fields else 0.0
+        
+
+def llm_validation_ndjson_file(project_name: str) -> str:
+    """Path of the NDJSON file a project's field verdicts are streamed to while it is evaluated."""
+    return os.path.join("results/llm_validation", f"{project_name}_llm_validation.ndjson")
+
+
+def rebuild_json_from_ndjson(project_name: str) -> Optional[Dict]:
+    """
+    Rebuild a project's evaluation results from its streamed NDJSON file, in the
+    format save_llm_evaluation_results writes. Useful after an interrupted run,
+    where the NDJSON file holds every field judged before the interruption.
+    
+    Args:
+        project_name: Name of the evaluated project
+    
+    Returns:
+        Dictionary with evaluation results, or None if the project has no NDJSON file
+        or its header line is missing or unreadable
+    """
+    ndjson_file = llm_validation_ndjson_file(project_name)
+    if not os.path.exists(ndjson_file):
+        print(f"❌ NDJSON file not found: {ndjson_file}")
+        return None
+    
+    with open(ndjson_file, 'rb') as f:
+        try:
+            header = loads_json(f.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or not all(key in header for key in NDJSON_HEADER_KEYS):
+            print(f"❌ NDJSON file has no valid header line: {ndjson_file}")
+            return None
+        evaluation_results = _new_evaluation_results(*(header[key] for key in NDJSON_HEADER_KEYS))
+        
+        for line in f:
+            try:
+                record = loads_json(line)
+            except ValueError:
+                # A line cut short by the interruption
+                continue
+            if not isinstance(record, dict) or "field" not in record:
+                continue
+            field_name = record.pop("field")
+            _record_field_evaluation(evaluation_results, field_name, record)
+    
+    _set_average_confidences(evaluation_results)
+    return evaluation_results
+
+
 def create_llm_validation_directory():
     """Create LLM validation directory if it doesn't exist."""
     llm_validation_dir = "results/llm_validation"
@@ -620,8 +1124,7 @@ def save_llm_evaluation_results(evaluation_results: Dict):
     filename = f"{project_name}_llm_validation.json"
     filepath = os.path.join(llm_validation_dir, filename)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(evaluation_results, f, indent=2, ensure_ascii=False)
+    dump_json_atomic(evaluation_results, filepath)
     
     print(f"💾 LLM evaluation results saved to: {filepath}")
 
@@ -670,33 +1173,34 @@ def evaluate_all_projects_llm():
         return
     
     # Get all projects that have agent results
-    project_names = []
+    project_names = set()
     for agent in ["basic", "function", "expert"]:
         agent_dir = f"results/{agent}"
-        if os.path.exists(agent_dir):
-            for filename in os.listdir(agent_dir):
-                if filename.endswith(f'_{agent}.json'):
-                    project_name = filename[:-len(f'_{agent}.json')]
-                    if project_name not in project_names:
-                        project_names.append(project_name)
+        suffix = f"_{agent}.json"
+        if os.path.isdir(agent_dir):
+            with os.scandir(agent_dir) as entries:
+                project_names.update(entry.name[:-len(suffix)] for entry in entries if entry.name.endswith(suffix))
     
     if not project_names:
         print("❌ No agent result files found")
         return
     
-    project_names.sort()
+    project_names = sorted(project_names)
     print(f"📁 Found {len(project_names)} projects with agent results:")
     for i, project_name in enumerate(project_names, 1):
         print(f"   {i}. {project_name}")
     
-    # Check which projects already have LLM evaluations
+    # Check which projects already have LLM evaluations, listing the directory once
     llm_validation_dir = "results/llm_validation"
+    evaluation_files = set()
+    if os.path.isdir(llm_validation_dir):
+        with os.scandir(llm_validation_dir) as entries:
+            evaluation_files = {entry.name for entry in entries}
     existing_evaluations = []
     pending_evaluations = []
     
     for project_name in project_names:
-        evaluation_file = os.path.join(llm_validation_dir, f"{project_name}_llm_validation.json")
-        if os.path.exists(evaluation_file):
+        if f"{project_name}_llm_validation.json" in evaluation_files:
             existing_evaluations.append(project_name)
         else:
             pending_evaluations.append(project_name)
@@ -722,45 +1226,57 @@ def evaluate_all_projects_llm():
     print(f"\n⏱️ Starting LLM evaluation...")
     
     # Track overall results
-    completed_evaluations = 0
-    failed_evaluations = 0
+    progress = {"completed": 0, "failed": 0}
     
-    # Process each pending project
-    for i, project_name in enumerate(pending_evaluations, 1):
-        print(f"\n{'🔄' * 60}")
-        print(f"📋 LLM Evaluating Project {i}/{len(pending_evaluations)}: {project_name}")
-        print(f"{'🔄' * 60}")
-        
-        try:
-            # Run LLM evaluation for this project
-            evaluation_results = judge.evaluate_project(project_name)
-            
-            if evaluation_results:
-                save_llm_evaluation_results(evaluation_results)
-                print_llm_evaluation_summary(evaluation_results)
-                completed_evaluations += 1
-                print(f"✅ LLM evaluation completed for {project_name}")
-            else:
-                failed_evaluations += 1
-                print(f"❌ LLM evaluation failed for {project_name}")
+    async def evaluate_pending_project(i, project_name, semaphore):
+        async with semaphore:
+            print(f"\n{'🔄' * 60}")
+            print(f"📋 LLM Evaluating Project {i}/{len(pending_evaluations)}: {project_name}")
+            print(f"{'🔄' * 60}")
             
-        except KeyboardInterrupt:
-            print(f"\n\n⏹️ LLM evaluation interrupted by user.")
-            print(f"📊 Progress so far:")
-            print(f"   ✅ Completed: {completed_evaluations}")
-            print(f"   ❌ Failed: {failed_evaluations}")
-            print(f"   ⏭️ Remaining: {len(pending_evaluations) - i}")
-            return
+            try:
+                # Run LLM evaluation for this project
+                evaluation_results = await judge.evaluate_project(project_name)
+                
+                if evaluation_results:
+                    await asyncio.to_thread(save_llm_evaluation_results, evaluation_results)
+                    print_llm_evaluation_summary(evaluation_results)
+                    progress["completed"] += 1
+                    print(f"✅ LLM evaluation completed for {project_name}")
+                else:
+                    progress["failed"] += 1
+                    print(f"❌ LLM evaluation failed for {project_name}")
             
-        except Exception as e:
-            print(f"❌ Error during LLM evaluation of {project_name}: {e}")
-            failed_evaluations += 1
+            except Exception as e:
+                print(f"❌ Error during LLM evaluation of {project_name}: {e}")
+                progress["failed"] += 1
         
         # Progress indicator
-        remaining = len(pending_evaluations) - i
+        remaining = len(pending_evaluations) - progress["completed"] - progress["failed"]
         if remaining > 0:
             print(f"\n⏳ {remaining} projects remaining...")
     
+    async def evaluate_pending_projects():
+        # Evaluate up to MAX_CONCURRENT_PROJECTS projects at once in a single event loop
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROJECTS)
+        await asyncio.gather(*(
+            evaluate_pending_project(i, project_name, semaphore)
+            for i, project_name in enumerate(pending_evaluations, 1)
+        ))
+    
+    try:
+        asyncio.run(evaluate_pending_projects())
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️ LLM evaluation interrupted by user.")
+        print(f"📊 Progress so far:")
+        print(f"   ✅ Completed: {progress['completed']}")
+        print(f"   ❌ Failed: {progress['failed']}")
+        print(f"   ⏭️ Remaining: {len(pending_evaluations) - progress['completed'] - progress['failed']}")
+        return
+    
+    completed_evaluations = progress["completed"]
+    failed_evaluations = progress["failed"]
+    
     # Final summary
     print(f"\n{'🏁' * 60}")
     print("📊 LLM EVALUATION COMPLETE")
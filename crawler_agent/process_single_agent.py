@@ -5,13 +5,67 @@ This script allows you to run just one agent on all projects and update existing
 """
 
 import os
-import json
 import time
-from typing import Any
+import shutil
+import hashlib
+import logging
+import random
+import asyncio
+import functools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
 from crawler_agent.agents.basic import BasicAgent
 from crawler_agent.agents.function import FunctionAgent
 from crawler_agent.agents.expert import ExpertAgent
+from crawler_agent.agents.base import throttle_wait_seconds
+from crawler_agent.utils import (
+    AGENT_CACHE_DIR, agent_cache_enabled, agent_cache_file, dump_json, dump_json_atomic, load_cached_result,
+    load_json, store_cached_result
+)
+
+try:
+    from tqdm import tqdm
+except ImportError:  # optional: a one-line note per finished run is printed instead of a progress bar
+    tqdm = None
+
+# Per-run details (banners, timings, cache hits) are logged at DEBUG level; warnings and
+# errors still show without any logging configuration
+logger = logging.getLogger(__name__)
+
+# Default number of agent runs at the same time; agent calls are I/O-bound on the Gemini API.
+# Set AGENT_CONCURRENCY in the environment or .env to change it (agent requests stay within
+# AGENT_RPM / AGENT_TPM either way)
+DEFAULT_CONCURRENT_PROJECTS = 8
+
+# Transient API errors worth retrying: rate limits/quota (429), server errors and timeouts
+RETRYABLE_API_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded
+)
+
+# Retries of an agent run that hit a transient API error, and the cap on the exponential backoff, in seconds
+AGENT_MAX_RETRIES = 5
+AGENT_MAX_BACKOFF = 60
+
+
+def get_max_concurrent_projects() -> int:
+    """
+    Return the number of agent runs allowed at the same time, from AGENT_CONCURRENCY.
+
+    Read when a batch starts rather than at import, so a value from .env (loaded by the
+    process_* entry points) is seen. Invalid values fall back to the default; the result is at least 1.
+    """
+    value = os.getenv("AGENT_CONCURRENCY") or str(DEFAULT_CONCURRENT_PROJECTS)
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("⚠️ Ignoring invalid AGENT_CONCURRENCY=%r, using %d", value, DEFAULT_CONCURRENT_PROJECTS)
+        return DEFAULT_CONCURRENT_PROJECTS
 
 
 def create_results_directory(agent_name: str):
@@ -19,88 +73,202 @@ def create_results_directory(agent_name: str):
     directories = [
         "results",
         f"results/{agent_name.lower()}",
-        "results/comparison"
+        "results/comparison",
+        AGENT_CACHE_DIR
     ]
 
     for directory in directories:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
             print(f"Created directory: {directory}")
 
 
-def test_single_agent(agent, agent_name: str, input_file: str, config_file: str, output_file: str):
-    """Test a single agent and return results."""
-    print(f"\n{'=' * 50}")
-    print(f"🧪 Testing {agent_name}")
-    print(f"{'=' * 50}")
+def agent_output_file(project_name: str, agent_name: str) -> str:
+    """Return the path of an agent's output file for a project (agent_name as in "Basic")."""
+    agent_lc = agent_name.lower()
+    return f"results/{agent_lc}/{project_name}_{agent_lc}.json"
 
-    start_time = time.time()
+
+def file_hash(file_path: str) -> str:
+    """Return a hash of a file's content, read in chunks."""
+    content_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def read_file_bytes(file_path: str) -> bytes:
+    """Read a file's raw content."""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def test_single_agent(agent, agent_name: str, input_file: str, config_file: str, output_file: str,
+                      html_bytes: bytes = None, config_bytes: bytes = None, include_data: bool = False):
+    """
+    Test a single agent and return results, reusing a cached result for unchanged inputs.
+
+    The result points to the agent's output file; pass include_data=True to also embed
+    the extracted data (which then ends up in the comparison file as well).
+
+    Pass html_bytes when input_file was already read (e.g. once for all agents of a
+    project); the agent then processes those bytes instead of reading the file again.
+    Likewise, config_bytes (the raw config_file, used for the cache key) can be read
+    once for a whole batch.
+    """
+    logger.debug("🧪 Testing %s", agent_name)
+
+    cache_file = None
+    if agent_cache_enabled():
+        cache_file = agent_cache_file(
+            agent,
+            html_bytes if html_bytes is not None else read_file_bytes(input_file),
+            config_bytes if config_bytes is not None else read_file_bytes(config_file)
+        )
+
+        cached = load_cached_result(cache_file)
+        if cached is not None:
+            dump_json(cached["data"], output_file)
+            # Report the time of the original run so cached projects stay comparable
+            logger.debug("♻️ %s reused cached result (%.2f seconds when run)", agent_name, cached["processing_time"])
+            return {
+                "agent_name": agent_name,
+                "success": True,
+                "processing_time": cached["processing_time"],
+                "output_file": output_file,
+                "data": cached["data"] if include_data else None,
+                "error": None,
+                "cached": True
+            }
 
     try:
-        # Always process (overwrite existing files)
-        agent.process_and_save(input_file, config_file, output_file)
+        for attempt in range(AGENT_MAX_RETRIES + 1):
+            # Time only the attempt that goes through, not the backoff before it
+            # or any wait on the rate limiters during it
+            start_time = time.time()
+            throttle_start = throttle_wait_seconds()
+            try:
+                # Always process (overwrite existing files). The returned data says whether this
+                # run saved anything; a leftover output file from an earlier run doesn't count
+                # Agents that aren't BaseCrawlerAgent subclasses may only support reading the file
+                if html_bytes is not None and hasattr(agent, "process_bytes_and_save"):
+                    saved_data = agent.process_bytes_and_save(html_bytes, config_file, output_file)
+                else:
+                    saved_data = agent.process_and_save(input_file, config_file, output_file)
+                break
+            except RETRYABLE_API_ERRORS as e:
+                if attempt == AGENT_MAX_RETRIES:
+                    raise
+                # Jitter keeps concurrent projects from retrying in lockstep
+                delay = min(2 ** attempt + random.random(), AGENT_MAX_BACKOFF)
+                logger.warning("💡 %s hit a transient API error on %s (%s). Retrying in %.1f seconds (%d/%d)...",
+                               agent_name, input_file, type(e).__name__, delay, attempt + 1, AGENT_MAX_RETRIES)
+                time.sleep(delay)
 
         end_time = time.time()
-        processing_time = end_time - start_time
+        processing_time = end_time - start_time - (throttle_wait_seconds() - throttle_start)
 
-        if os.path.exists(output_file):
-            with open(output_file, 'r', encoding='utf-8') as f:
-                saved_data = json.load(f)
-
-            print(f"✅ {agent_name} completed in {processing_time:.2f} seconds")
+        if saved_data is not None:
+            logger.debug("✅ %s completed in %.2f seconds", agent_name, processing_time)
+            if cache_file:
+                store_cached_result(cache_file, processing_time, saved_data)
             return {
                 "agent_name": agent_name,
                 "success": True,
                 "processing_time": processing_time,
-                "data": saved_data,
-                "error": None
+                "output_file": output_file,
+                "data": saved_data if include_data else None,
+                "error": None,
+                "cached": False
             }
         else:
-            print(f"❌ {agent_name} failed - no output file created")
+            logger.error("❌ %s failed on %s - no output file created", agent_name, input_file)
             return {
                 "agent_name": agent_name,
                 "success": False,
                 "processing_time": processing_time,
+                "output_file": None,
                 "data": None,
-                "error": "No output file created"
+                "error": "No output file created",
+                "cached": False
             }
 
     except Exception as e:
         end_time = time.time()
-        processing_time = end_time - start_time
-        print(f"❌ {agent_name} failed after {processing_time:.2f} seconds: {e}")
+        processing_time = end_time - start_time - (throttle_wait_seconds() - throttle_start)
+        logger.error("❌ %s failed on %s after %.2f seconds: %s", agent_name, input_file, processing_time, e)
         return {
             "agent_name": agent_name,
             "success": False,
             "processing_time": processing_time,
+            "output_file": None,
             "data": None,
-            "error": str(e)
+            "error": str(e),
+            "cached": False
         }
 
 
 def update_comparison_file(project_name: str, agent_name: str, agent_result: dict):
     """Update or create comparison file with the new agent result."""
+    update_comparison_file_for_agents(project_name, {agent_name: agent_result})
+
+
+def update_comparison_file_for_agents(project_name: str, agent_results: Dict[str, dict]):
+    """
+    Update or create a project's comparison file with new results of one or more agents.
+
+    Args:
+        project_name (str): Name of the project
+        agent_results: Dict mapping agent name (e.g., "Basic") to its test_single_agent result
+    """
+    comparison_data = load_comparison_data(project_name)
+    update_comparison_data(comparison_data, agent_results)
+    save_comparison_data(project_name, comparison_data)
+
+
+def load_comparison_data(project_name: str) -> dict:
+    """Load a project's comparison data, or create an empty comparison if it has none yet."""
     comparison_file = f"results/comparison/{project_name}_comparison.json"
 
     # Load existing comparison data or create new
     if os.path.exists(comparison_file):
-        with open(comparison_file, 'r', encoding='utf-8') as f:
-            comparison_data = json.load(f)
-    else:
-        comparison_data = {
-            "basic_agent": None,
-            "function_agent": None,
-            "expert_agent": None,
-            "summary": {
-                "successful_count": 0,
-                "total_count": 3,
-                "fastest_agent": None
-            }
+        return load_json(comparison_file)
+    return empty_comparison_data()
+
+
+def empty_comparison_data() -> dict:
+    """Create the comparison data of a project no agent has processed yet."""
+    return {
+        "basic_agent": None,
+        "function_agent": None,
+        "expert_agent": None,
+        "summary": {
+            "successful_count": 0,
+            "total_count": 3,
+            "fastest_agent": None
         }
+    }
+
+
+def save_comparison_data(project_name: str, comparison_data: dict):
+    """Write a project's comparison data to its comparison file."""
+    comparison_file = f"results/comparison/{project_name}_comparison.json"
+    dump_json_atomic(comparison_data, comparison_file)
+    logger.debug("📊 Updated comparison file: %s", comparison_file)
 
-    # Update the specific agent's data
-    agent_key = f"{agent_name.lower()}_agent"
-    comparison_data[agent_key] = agent_result
+
+def update_comparison_data(comparison_data: dict, agent_results: Dict[str, dict]):
+    """
+    Store new agent results in a project's comparison data and recalculate its summary.
+
+    Args:
+        comparison_data (dict): Comparison data as returned by load_comparison_data, updated in place
+        agent_results: Dict mapping agent name (e.g., "Basic") to its test_single_agent result
+    """
+    # Update the specific agents' data
+    for agent_name, agent_result in agent_results.items():
+        comparison_data[f"{agent_name.lower()}_agent"] = agent_result
 
     # Recalculate summary
     agents = ["basic_agent", "function_agent", "expert_agent"]
@@ -119,15 +287,139 @@ def update_comparison_file(project_name: str, agent_name: str, agent_result: dic
     else:
         comparison_data["summary"]["fastest_agent"] = None
 
-    # Save updated comparison
-    with open(comparison_file, 'w', encoding='utf-8') as f:
-        json.dump(comparison_data, f, indent=2, ensure_ascii=False)
 
-    print(f"📊 Updated comparison file: {comparison_file}")
+async def run_agents_for_projects(agents: Dict[str, Any], jobs: List[Tuple[str, str]], config_file: str,
+                                  max_concurrent: Optional[int] = None, include_data: bool = False,
+                                  on_result: Optional[Callable[[str, str, Any], None]] = None):
+    """
+    Run test_single_agent for several (project, agent) jobs at once.
+
+    Agent runs are synchronous and wait on the Gemini API, so each job runs in
+    its own thread, with at most max_concurrent of them in flight. The threads come
+    from a pool of that size rather than asyncio's default executor, which has only
+    min(32, CPU count + 4) threads and would otherwise cap the concurrency.
+
+    Args:
+        agents: Dict mapping agent name (e.g., "Basic") to its agent instance
+        jobs (List[Tuple[str, str]]): (project name, agent name) pairs to run
+        config_file (str): Path to the configuration file
+        max_concurrent (int): Maximum number of jobs run at the same time (default: AGENT_CONCURRENCY)
+        include_data (bool): Embed the extracted data in each result (default: False)
+        on_result: Optional callback called with (project name, agent name, result) as each
+            job finishes, so callers keep the finished jobs if the batch is cancelled
+
+    Returns:
+        List with the test_single_agent result of each job, in the same order as jobs
+        (the exception instead if its run raised)
+    """
+    max_concurrent = max(1, max_concurrent or get_max_concurrent_projects())
+    semaphore = asyncio.Semaphore(max_concurrent)
+    executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="agent")
+    loop = asyncio.get_running_loop()
+    progress = tqdm(total=len(jobs), desc=f"{', '.join(agents)} Agent", unit="run") if tqdm else None
+    finished = 0
+
+    # The config is the same for every job, so read it once; agents parse it through
+    # utils.load_config, which already parses each version of the file only once
+    config_bytes = await asyncio.to_thread(read_file_bytes, config_file)
+
+    # Each project's HTML is read once, shared by its agents and dropped after the last of them
+    html_reads = {}
+    for project_name, _ in jobs:
+        html_reads.setdefault(project_name, {"lock": asyncio.Lock(), "html_bytes": None, "pending": 0})
+        html_reads[project_name]["pending"] += 1
+
+    async def run_job(i, project_name, agent_name):
+        nonlocal finished
+        # File paths; the HTML file was found when the projects were listed
+        html_file = f"single_samples/{project_name}.html"
+        output_file = agent_output_file(project_name, agent_name)
+        html_read = html_reads[project_name]
+
+        async with semaphore:
+            try:
+                async with html_read["lock"]:
+                    if html_read["html_bytes"] is None:
+                        html_read["html_bytes"] = await asyncio.to_thread(read_file_bytes, html_file)
+
+                logger.debug("📋 Processing Project %d/%d: %s (%s Agent)", i, len(jobs), project_name, agent_name)
+                result = await loop.run_in_executor(executor, functools.partial(
+                    test_single_agent, agents[agent_name], f"{agent_name} Agent", html_file, config_file,
+                    output_file, html_read["html_bytes"], config_bytes, include_data
+                ))
+            except Exception as e:
+                # Reported like any other result; the remaining jobs keep running
+                result = e
+            finally:
+                html_read["pending"] -= 1
+                if not html_read["pending"]:
+                    html_read["html_bytes"] = None
+
+        finished += 1
+        if progress is not None:
+            progress.update()
+        else:
+            print(f"📋 {finished}/{len(jobs)} done: {project_name} ({agent_name} Agent)")
+        if on_result is not None:
+            on_result(project_name, agent_name, result)
+        return result
+
+    try:
+        return await asyncio.gather(
+            *(run_job(i, project_name, agent_name) for i, (project_name, agent_name) in enumerate(jobs, 1))
+        )
+    finally:
+        # After a cancellation (e.g. Ctrl+C) queued runs are dropped; runs already inside an
+        # agent can't be stopped and finish in the background, filling the result cache
+        executor.shutdown(wait=False, cancel_futures=True)
+        if progress is not None:
+            progress.close()
+
+
+def list_agent_outputs(agent_name: str) -> Set[str]:
+    """
+    List the names of an agent's non-empty output files with a single directory scan.
+
+    An empty file is what an interrupted write most likely leaves behind (the file is
+    truncated before the whole document is written at once), so it doesn't count.
+    """
+    with os.scandir(f"results/{agent_name.lower()}") as entries:
+        return {entry.name for entry in entries if entry.name.endswith('.json') and entry.stat().st_size > 0}
+
+
+def is_project_completed(project_name: str, agent_name: str, comparison_data: dict,
+                         existing_outputs: Optional[Set[str]] = None) -> bool:
+    """
+    Check whether an agent already processed a project successfully.
+
+    Args:
+        project_name (str): Name of the project
+        agent_name (str): Name of the agent (e.g., "Basic", "Function", "Expert")
+        comparison_data (dict): The project's comparison data, see load_comparison_data
+        existing_outputs (Set[str]): The agent's output file names from list_agent_outputs; when
+            given, they are looked up instead of opening and parsing the output file
+
+    Returns:
+        bool: True if the comparison data records a successful run and the agent's output file is valid JSON
+            (with existing_outputs: a non-empty file)
+    """
+    agent_result = comparison_data.get(f"{agent_name.lower()}_agent")
+    if not (agent_result and agent_result.get("success")):
+        return False
+    output_file = agent_output_file(project_name, agent_name)
+    if existing_outputs is not None:
+        return os.path.basename(output_file) in existing_outputs
+    try:
+        load_json(output_file)
+    except (OSError, ValueError):
+        return False
+    return True
 
 
 def process_agent_for_all_projects(agent_name: str, agent_instance: Any,
-                                   config_file: str = "configs/single_project_config.json"):
+                                   config_file: str = "configs/single_project_config.json",
+                                   max_concurrent: Optional[int] = None, resume: bool = True,
+                                   include_data: bool = False):
     """
     Process all single samples for a specific agent.
     
@@ -135,8 +427,35 @@ def process_agent_for_all_projects(agent_name: str, agent_instance: Any,
         agent_name (str): Name of the agent (e.g., "Basic", "Function", "Expert")
         agent_instance: Instance of the agent class
         config_file (str): Path to the configuration file
+        max_concurrent (int): Maximum number of projects processed at the same time (default: AGENT_CONCURRENCY)
+        resume (bool): Skip projects the agent already processed successfully (default: True);
+            pass False to process every project again
+        include_data (bool): Also store the extracted data in the comparison files (default: False);
+            otherwise they only point to each agent's output file
+    """
+    process_agents_for_all_projects({agent_name: agent_instance}, config_file, max_concurrent, resume, include_data)
+
+
+def process_agents_for_all_projects(agents: Dict[str, Any],
+                                    config_file: str = "configs/single_project_config.json",
+                                    max_concurrent: Optional[int] = None, resume: bool = True,
+                                    include_data: bool = False):
+    """
+    Process all single samples with one or more agents, running every (project, agent) pair concurrently.
+    
+    Args:
+        agents: Dict mapping agent name (e.g., "Basic", "Function", "Expert") to its agent instance
+        config_file (str): Path to the configuration file
+        max_concurrent (int): Maximum number of agent runs at the same time, shared by all agents
+            (default: AGENT_CONCURRENCY)
+        resume (bool): Skip projects an agent already processed successfully (default: True);
+            pass False to process every project again
+        include_data (bool): Also store the extracted data in the comparison files (default: False);
+            otherwise they only point to each agent's output file
     """
-    print(f"🚀 Starting Single Agent Processing: {agent_name}")
+    max_concurrent = max(1, max_concurrent or get_max_concurrent_projects())
+    agent_names = ", ".join(agents)
+    print(f"🚀 Starting Single Agent Processing: {agent_names}")
     print("=" * 60)
 
     # Validate config file
@@ -144,8 +463,9 @@ def process_agent_for_all_projects(agent_name: str, agent_instance: Any,
         print(f"❌ Config file not found: {config_file}")
         return
 
-    # Create results directory for this agent
-    create_results_directory(agent_name)
+    # Create results directory for each agent
+    for agent_name in agents:
+        create_results_directory(agent_name)
 
     # Get all project names from single_samples folder
     single_samples_dir = "single_samples"
@@ -153,82 +473,147 @@ def process_agent_for_all_projects(agent_name: str, agent_instance: Any,
         print(f"❌ Directory not found: {single_samples_dir}")
         return
 
-    # Find all HTML files and extract project names
-    project_names = []
-    for filename in os.listdir(single_samples_dir):
-        if filename.endswith('.html'):
-            project_name = filename[:-5]  # Remove .html extension
-            project_names.append(project_name)
+    # Find all HTML files and extract project names, sorted alphabetically for consistent processing
+    with os.scandir(single_samples_dir) as entries:
+        project_names = sorted(entry.name.removesuffix('.html') for entry in entries
+                               if entry.name.endswith('.html') and entry.is_file())
 
     if not project_names:
         print(f"❌ No HTML files found in {single_samples_dir}")
         return
 
-    project_names.sort()  # Sort alphabetically for consistent processing
-
-    print(f"📁 Found {len(project_names)} projects:")
+    print(f"📁 Found {len(project_names)} projects")
     for i, project_name in enumerate(project_names, 1):
-        print(f"   {i}. {project_name}")
+        logger.debug("   %d. %s", i, project_name)
 
-    print(f"\n⏱️ Starting processing with {agent_name} Agent...")
-
-    # Track results
-    successful_projects = 0
-    failed_projects = 0
-    start_time = time.time()
-
-    # Process each project
-    for i, project_name in enumerate(project_names, 1):
-        print(f"\n{'🔄' * 60}")
-        print(f"📋 Processing Project {i}/{len(project_names)}: {project_name}")
-        print(f"{'🔄' * 60}")
-
-        # File paths
-        html_file = f"{single_samples_dir}/{project_name}.html"
-        output_file = f"results/{agent_name.lower()}/{project_name}_{agent_name.lower()}.json"
+    # Read each project's comparison once; results are merged in memory and written at the end
+    comparisons = {}
+    for project_name in project_names:
+        try:
+            comparisons[project_name] = load_comparison_data(project_name)
+        except ValueError as e:
+            print(f"⚠️ Unreadable comparison file for {project_name}, starting a new one: {e}")
+            comparisons[project_name] = empty_comparison_data()
+
+    # Projects finished by an earlier, possibly interrupted, run are skipped
+    jobs = [(project_name, agent_name) for project_name in project_names for agent_name in agents]
+    if resume:
+        # One directory scan per agent instead of opening every output file
+        existing_outputs = {agent_name: list_agent_outputs(agent_name) for agent_name in agents}
+        pending_jobs = [(project_name, agent_name) for project_name, agent_name in jobs
+                        if not is_project_completed(project_name, agent_name, comparisons[project_name],
+                                                    existing_outputs[agent_name])]
+        if len(pending_jobs) < len(jobs):
+            print(f"\n⏭️ Skipping {len(jobs) - len(pending_jobs)} project runs already completed by "
+                  f"{agent_names} Agent (pass resume=False to process them again)")
+        jobs = pending_jobs
+
+    # Byte-identical pages (e.g. the same project saved under two names) are processed once per
+    # agent; the other projects of the group get copies of that run's output file and result.
+    # Only pages whose size matches another page's can be identical, so only those are hashed
+    html_sizes = {project_name: os.path.getsize(f"single_samples/{project_name}.html")
+                  for project_name in {project_name for project_name, _ in jobs}}
+    size_counts = Counter(html_sizes.values())
+    html_keys = {
+        project_name: (size, file_hash(f"single_samples/{project_name}.html") if size_counts[size] > 1 else None)
+        for project_name, size in html_sizes.items()
+    }
+    representatives = {}
+    duplicate_projects = {}
+    unique_jobs = []
+    for project_name, agent_name in jobs:
+        representative = representatives.setdefault((html_keys[project_name], agent_name), project_name)
+        if representative == project_name:
+            unique_jobs.append((project_name, agent_name))
+        else:
+            duplicate_projects.setdefault((representative, agent_name), []).append(project_name)
+    if len(unique_jobs) < len(jobs):
+        print(f"\n📎 {len(jobs) - len(unique_jobs)} project runs have the same HTML as another project "
+              f"and will reuse its results")
 
-        if not os.path.exists(html_file):
-            print(f"❌ HTML file not found: {html_file}")
-            failed_projects += 1
-            continue
+    print(f"\n⏱️ Starting processing with {agent_names} Agent ({max_concurrent} runs at a time)...")
 
-        # Test the agent
-        agent_result = test_single_agent(agent_instance, f"{agent_name} Agent", html_file, config_file, output_file)
+    start_time = time.time()
 
-        # Update comparison file
+    # Collect each project's new results as they arrive, so its comparison file is written once
+    # and an interrupted run still saves the runs that finished
+    results_by_project = {}
+    failed_project_names = set()
+    unfinished_runs = {}
+    for project_name, agent_name in jobs:
+        unfinished_runs[project_name] = unfinished_runs.get(project_name, 0) + 1
+
+    def record_result(project_name, agent_name, agent_result):
+        unfinished_runs[project_name] -= 1
+        if isinstance(agent_result, Exception):
+            print(f"❌ {agent_name} Agent failed for {project_name}: {agent_result}")
+            failed_project_names.add(project_name)
+            return
+        results_by_project.setdefault(project_name, {})[agent_name] = agent_result
+
+    def collect_result(project_name, agent_name, agent_result):
+        record_result(project_name, agent_name, agent_result)
+        for duplicate_name in duplicate_projects.get((project_name, agent_name), []):
+            duplicate_result = agent_result
+            if not isinstance(agent_result, Exception) and agent_result["output_file"]:
+                duplicate_output = agent_output_file(duplicate_name, agent_name)
+                try:
+                    shutil.copyfile(agent_result["output_file"], duplicate_output)
+                    duplicate_result = dict(agent_result, output_file=duplicate_output)
+                except OSError as e:
+                    duplicate_result = e
+            record_result(duplicate_name, agent_name, duplicate_result)
+
+    # Process the projects concurrently
+    interrupted = False
+    try:
+        asyncio.run(run_agents_for_projects(agents, unique_jobs, config_file, max_concurrent, include_data,
+                                            collect_result))
+    except KeyboardInterrupt:
+        interrupted = True
+        finished_runs = sum(len(project_results) for project_results in results_by_project.values())
+        print(f"\n\n⏹️ Agent processing interrupted by user - saving the {finished_runs} finished runs...")
+
+    # Merge the new results and write each changed comparison file once
+    for project_name, project_results in results_by_project.items():
         try:
-            update_comparison_file(project_name, agent_name, agent_result)
+            update_comparison_data(comparisons[project_name], project_results)
+            save_comparison_data(project_name, comparisons[project_name])
 
-            if agent_result["success"]:
-                successful_projects += 1
-            else:
-                failed_projects += 1
+            if not all(agent_result["success"] for agent_result in project_results.values()):
+                failed_project_names.add(project_name)
 
         except Exception as e:
             print(f"❌ Failed to update comparison for {project_name}: {e}")
-            failed_projects += 1
+            failed_project_names.add(project_name)
 
-        # Progress indicator
-        remaining = len(project_names) - i
-        if remaining > 0:
-            print(f"\n⏳ {remaining} projects remaining...")
+    # A project succeeded when none of its agents failed; skipped projects count as successful,
+    # projects with runs cut short by an interruption count as neither
+    unfinished_projects = sum(1 for project_name, count in unfinished_runs.items()
+                              if count and project_name not in failed_project_names)
+    failed_projects = len(failed_project_names)
+    successful_projects = len(project_names) - failed_projects - unfinished_projects
 
     # Final summary
     end_time = time.time()
     total_time = end_time - start_time
 
-    print(f"\n{'🏁' * 60}")
-    print(f"📊 {agent_name.upper()} AGENT PROCESSING COMPLETE")
-    print(f"{'🏁' * 60}")
+    if interrupted:
+        print(f"\n⏹️ {agent_names.upper()} AGENT PROCESSING INTERRUPTED")
+    else:
+        print(f"\n🏁 {agent_names.upper()} AGENT PROCESSING COMPLETE")
 
     print(f"✅ Successful projects: {successful_projects}")
     print(f"❌ Failed projects: {failed_projects}")
+    if interrupted:
+        print(f"⏭️ Unfinished projects: {unfinished_projects} (run again to resume them)")
     print(f"📈 Total projects: {len(project_names)}")
     print(f"⏱️ Total processing time: {total_time:.2f} seconds")
     print(f"⚡ Average time per project: {total_time / len(project_names):.2f} seconds")
 
     print(f"\n💾 Results saved to:")
-    print(f"   📁 Agent results: results/{agent_name.lower()}/")
+    for agent_name in agents:
+        print(f"   📁 Agent results: results/{agent_name.lower()}/")
     print(f"   📊 Updated comparisons: results/comparison/")
 
 
@@ -271,6 +656,46 @@ def process_expert_agent():
     process_agent_for_all_projects("Expert", expert_agent)
 
 
+def process_all_agents():
+    """Process all projects with all three agents at once, writing each comparison file once per project."""
+    print("🔄 Processing with all agents...")
+
+    load_dotenv()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set.")
+
+    process_agents_for_all_projects({
+        "Basic": BasicAgent(api_key=api_key),
+        "Function": FunctionAgent(api_key=api_key),
+        "Expert": ExpertAgent(api_key=api_key)
+    })
+
+
+def build_validation_knowledge(validation_results: dict) -> Dict[str, Counter]:
+    """
+    Tally a project's earlier verdicts per extracted value, across all three agents.
+
+    Args:
+        validation_results (dict): The project's validation data, as saved by validate_results
+
+    Returns:
+        Dict mapping each validated value (as a stripped string) to a Counter of its
+        True (correct), False (incorrect) and None (skipped) verdicts
+    """
+    validation_knowledge = {}
+    agent_keys = [("basic_value", "basic_correct"), ("function_value", "function_correct"),
+                  ("expert_value", "expert_correct")]
+    for field_data in validation_results.get("field_validations", {}).values():
+        get = field_data.get
+        for value_key, correct_key in agent_keys:
+            value = get(value_key)
+            validation = get(correct_key)
+            if value is not None and validation is not None:
+                validation_knowledge.setdefault(str(value).strip(), Counter())[validation] += 1
+    return validation_knowledge
+
+
 def validate_single_agent_for_all_projects(agent_name: str):
     """
     Re-validate only one agent for all projects while keeping other agents' validations.
@@ -287,7 +712,8 @@ def validate_single_agent_for_all_projects(agent_name: str):
         load_project_results, 
         extract_project_fields,
         get_user_validation_three_agents,
-        format_field_value
+        format_field_value,
+        RESULT_COUNTERS
     )
     from datetime import datetime
     
@@ -299,18 +725,22 @@ def validate_single_agent_for_all_projects(agent_name: str):
         return
     
     # Get all projects that have results for this agent
-    agent_dir = f"results/{agent_name.lower()}"
+    agent_lc = agent_name.lower()
+    agent_key = f"{agent_lc}_agent"
+    # The other agents and their validation keys, shown next to each manual prompt
+    other_agents = [(other_name, f"{other_name.lower()}_correct") for other_name in valid_agents
+                    if other_name != agent_name]
+    agent_dir = f"results/{agent_lc}"
     if not os.path.exists(agent_dir):
         print(f"❌ No results found for {agent_name} agent: {agent_dir}")
-        print(f"💡 Run processing first: process_{agent_name.lower()}_agent()")
+        print(f"💡 Run processing first: process_{agent_lc}_agent()")
         return
     
     # Find all projects with results for this agent
-    project_names = []
-    for filename in os.listdir(agent_dir):
-        if filename.endswith(f'_{agent_name.lower()}.json'):
-            project_name = filename[:-len(f'_{agent_name.lower()}.json')]
-            project_names.append(project_name)
+    result_suffix = f"_{agent_lc}.json"
+    with os.scandir(agent_dir) as entries:
+        project_names = [entry.name.removesuffix(result_suffix) for entry in entries
+                         if entry.name.endswith(result_suffix)]
     
     if not project_names:
         print(f"❌ No result files found for {agent_name} agent in {agent_dir}")
@@ -322,13 +752,14 @@ def validate_single_agent_for_all_projects(agent_name: str):
     for i, project_name in enumerate(project_names, 1):
         print(f"   {i}. {project_name}")
     
-    # Check existing validations
+    # Check existing validations, listing the directory once
     validation_dir = create_validation_directory()
+    with os.scandir(validation_dir) as entries:
+        validation_files = {entry.name for entry in entries}
     projects_to_validate = []
     
     for project_name in project_names:
-        validation_file = os.path.join(validation_dir, f"{project_name}_validation.json")
-        if os.path.exists(validation_file):
+        if f"{project_name}_validation.json" in validation_files:
             projects_to_validate.append((project_name, "update"))
         else:
             projects_to_validate.append((project_name, "create"))
@@ -369,8 +800,7 @@ def validate_single_agent_for_all_projects(agent_name: str):
             
             if action == "update":
                 # Load existing validation
-                with open(validation_file, 'r', encoding='utf-8') as f:
-                    validation_results = json.load(f)
+                validation_results = load_json(validation_file)
                 print(f"📂 Loaded existing validation for {project_name}")
             else:
                 # Create new validation structure
@@ -402,11 +832,8 @@ def validate_single_agent_for_all_projects(agent_name: str):
             print(f"   Function Agent: {'✅' if function_data else '❌'} ({len(function_fields)} fields)")
             print(f"   Expert Agent: {'✅' if expert_data else '❌'} ({len(expert_fields)} fields)")
             
-            # Get all unique field names
-            all_fields = set()
-            all_fields.update(basic_fields.keys())
-            all_fields.update(function_fields.keys())
-            all_fields.update(expert_fields.keys())
+            # Get all unique field names, in the order they are validated
+            all_fields = sorted(basic_fields.keys() | function_fields.keys() | expert_fields.keys())
             
             if not all_fields:
                 print("❌ No fields found to validate")
@@ -414,40 +841,21 @@ def validate_single_agent_for_all_projects(agent_name: str):
                 continue
             
             # Reset only the target agent's counters
-            agent_key = f"{agent_name.lower()}_agent"
             validation_results[agent_key] = {"correct": 0, "incorrect": 0, "skipped": 0}
             
             print(f"\n🎯 Re-validating {agent_name} agent for {len(all_fields)} fields...")
             
             # Build a project-specific knowledge base from existing validation
             print(f"🧠 Building project-specific validation knowledge base...")
-            validation_knowledge = {}  # {normalized_value: {True: count, False: count, None: count}}
+            validation_knowledge = {}  # {normalized_value: Counter({True: count, False: count, None: count})}
             
-            # Only use validation data from the SAME project
-            current_validation_file = os.path.join(validation_dir, f"{project_name}_validation.json")
-            if os.path.exists(current_validation_file):
+            # Only use validation data from the SAME project: the validation loaded above, whose
+            # field validations are still as saved (only the target agent's counters were reset)
+            if action == "update":
                 try:
-                    with open(current_validation_file, 'r', encoding='utf-8') as f:
-                        existing_validation = json.load(f)
-                    
-                    # Extract validations from this project only
-                    for field, field_data in existing_validation.get("field_validations", {}).items():
-                        # Check all three agents' values and validations from THIS project
-                        for agent_type in ["basic", "function", "expert"]:
-                            value = field_data.get(f"{agent_type}_value")
-                            validation = field_data.get(f"{agent_type}_correct")
-                            
-                            if value is not None and validation is not None:
-                                # Normalize value for comparison
-                                normalized_value = str(value).strip() if value is not None else "NULL"
-                                
-                                if normalized_value not in validation_knowledge:
-                                    validation_knowledge[normalized_value] = {True: 0, False: 0, None: 0}
-                                
-                                validation_knowledge[normalized_value][validation] += 1
-                
+                    validation_knowledge = build_validation_knowledge(validation_results)
                 except Exception as e:
-                    print(f"⚠️ Warning: Could not read validation file {current_validation_file}: {e}")
+                    print(f"⚠️ Warning: Could not use validation file {validation_file}: {e}")
             
             # Show knowledge base summary
             known_values = len(validation_knowledge)
@@ -457,10 +865,12 @@ def validate_single_agent_for_all_projects(agent_name: str):
                 print(f"🧠 No previous validation data found for {project_name} - all validations will be manual")
             
             # Validate each field (only update the target agent)
+            target_fields = {"Basic": basic_fields, "Function": function_fields, "Expert": expert_fields}[agent_name]
+            target_correct_key = f"{agent_lc}_correct"
             auto_validated = 0
             manual_validations = 0
             
-            for field_name in sorted(all_fields):
+            for field_name in all_fields:
                 basic_value = basic_fields.get(field_name)
                 function_value = function_fields.get(field_name)
                 expert_value = expert_fields.get(field_name)
@@ -481,14 +891,7 @@ def validate_single_agent_for_all_projects(agent_name: str):
                     validation_results["field_validations"][field_name]["function_value"] = function_value
                     validation_results["field_validations"][field_name]["expert_value"] = expert_value
                 
-                # Get target value
-                target_value = None
-                if agent_name == "Basic":
-                    target_value = basic_value
-                elif agent_name == "Function":
-                    target_value = function_value
-                elif agent_name == "Expert":
-                    target_value = expert_value
+                target_value = target_fields.get(field_name)
                 
                 # Normalize target value for knowledge lookup
                 normalized_target = str(target_value).strip() if target_value is not None else "NULL"
@@ -500,21 +903,14 @@ def validate_single_agent_for_all_projects(agent_name: str):
                 if normalized_target in validation_knowledge:
                     knowledge = validation_knowledge[normalized_target]
                     
-                    # Use the most common validation result for this value
-                    if knowledge[True] > knowledge[False] and knowledge[True] > knowledge[None]:
-                        result = True
-                        auto_validated_reason = f"Previously validated as CORRECT {knowledge[True]} times"
-                    elif knowledge[False] > knowledge[True] and knowledge[False] > knowledge[None]:
-                        result = False
-                        auto_validated_reason = f"Previously validated as INCORRECT {knowledge[False]} times"
-                    elif knowledge[None] > knowledge[True] and knowledge[None] > knowledge[False]:
-                        result = None
-                        auto_validated_reason = f"Previously SKIPPED {knowledge[None]} times"
-                    
-                    # If there's a clear majority (more than 50%), use auto-validation
-                    total_validations = sum(knowledge.values())
-                    if result is not None and knowledge[result] / total_validations > 0.5:
+                    # Use the most common validation result for this value if it has a clear
+                    # majority (more than 50%); a majority of skips still asks the user
+                    top_result, top_count = knowledge.most_common(1)[0]
+                    if top_result is not None and top_count * 2 > sum(knowledge.values()):
                         # Auto-validate based on previous knowledge
+                        result = top_result
+                        auto_validated_reason = (f"Previously validated as {'CORRECT' if result else 'INCORRECT'} "
+                                                 f"{top_count} times")
                         target_display = format_field_value(target_value)
                         
                         print(f"\n📋 Field: {field_name}")
@@ -522,25 +918,16 @@ def validate_single_agent_for_all_projects(agent_name: str):
                         print(f"💡 Reason: {auto_validated_reason}")
                         
                         auto_validated += 1
-                    else:
-                        # Conflicting previous validations, ask user
-                        result = None
-                        auto_validated_reason = None
                 
                 # If no auto-validation possible, ask user
                 if result is None or auto_validated_reason is None:
                     # Show current validation status for other agents
                     field_validation = validation_results["field_validations"][field_name]
-                    other_validations = []
-                    if agent_name != "Basic" and field_validation.get("basic_correct") is not None:
-                        status = "✅" if field_validation["basic_correct"] else "❌"
-                        other_validations.append(f"Basic: {status}")
-                    if agent_name != "Function" and field_validation.get("function_correct") is not None:
-                        status = "✅" if field_validation["function_correct"] else "❌"
-                        other_validations.append(f"Function: {status}")
-                    if agent_name != "Expert" and field_validation.get("expert_correct") is not None:
-                        status = "✅" if field_validation["expert_correct"] else "❌"
-                        other_validations.append(f"Expert: {status}")
+                    other_validations = [
+                        f"{other_name}: {'✅' if field_validation[correct_key] else '❌'}"
+                        for other_name, correct_key in other_agents
+                        if field_validation.get(correct_key) is not None
+                    ]
                     
                     print(f"\n📋 Field: {field_name}")
                     if other_validations:
@@ -572,20 +959,10 @@ def validate_single_agent_for_all_projects(agent_name: str):
                     manual_validations += 1
                 
                 # Update only the target agent's validation
-                if agent_name == "Basic":
-                    validation_results["field_validations"][field_name]["basic_correct"] = result
-                elif agent_name == "Function":
-                    validation_results["field_validations"][field_name]["function_correct"] = result
-                elif agent_name == "Expert":
-                    validation_results["field_validations"][field_name]["expert_correct"] = result
+                validation_results["field_validations"][field_name][target_correct_key] = result
                 
                 # Update counters
-                if result is True:
-                    validation_results[agent_key]["correct"] += 1
-                elif result is False:
-                    validation_results[agent_key]["incorrect"] += 1
-                else:  # None (skipped)
-                    validation_results[agent_key]["skipped"] += 1
+                validation_results[agent_key][RESULT_COUNTERS.get(result, "skipped")] += 1
             
             print(f"\n📊 Validation Summary:")
             print(f"   🧠 Auto-validated: {auto_validated}")
@@ -596,8 +973,7 @@ def validate_single_agent_for_all_projects(agent_name: str):
             validation_results["validation_date"] = datetime.now().isoformat()
             
             # Save updated validation
-            with open(validation_file, 'w', encoding='utf-8') as f:
-                json.dump(validation_results, f, indent=2, ensure_ascii=False)
+            dump_json_atomic(validation_results, validation_file)
             
             completed_validations += 1
             print(f"✅ Re-validation completed for {project_name}")
@@ -642,6 +1018,9 @@ def validate_single_agent_for_all_projects(agent_name: str):
 
 def main():
     """Example usage - choose which agent to process or validate."""
+    # Plain messages, matching the prints; set LOG_LEVEL=DEBUG for per-run details
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+
     print("🎯 Single Agent Processor & Validator")
     print("=" * 50)
 
@@ -663,9 +1042,7 @@ def main():
     elif choice == "3":
         process_expert_agent()
     elif choice == "4":
-        process_basic_agent()
-        process_function_agent()
-        process_expert_agent()
+        process_all_agents()
     elif choice == "5":
         validate_single_agent_for_all_projects("Basic")
     elif choice == "6":
@@ -0,0 +1,384 @@
+"""
+Shared aggregation kernel for the human and LLM scoring scripts.
+"""
+
+import os
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Tuple, TypedDict
+
+try:
+    import msgspec
+except ImportError:  # optional: fall back to the stdlib json parser
+    msgspec = None
+
+
+AGENT_KEYS = ["basic_agent", "function_agent", "expert_agent"]
+
+# Display names for each agent key, shared by the printers and report writers
+AGENT_NAMES = {
+    "basic_agent": "Basic Agent",
+    "function_agent": "Function Agent",
+    "expert_agent": "Expert Agent"
+}
+
+# Per-file score cache: path -> (file signature, comparison signature, project entry, partial stats)
+SCORE_CACHE_FILE = "results/.score_cache.pkl"
+SCORE_CACHE_MAX_ENTRIES = 10000
+
+# Below this many uncached files, scoring serially beats process pool startup
+PARALLEL_SCORING_MIN_FILES = 32
+
+
+class AgentCounts(TypedDict, total=False):
+    """Per-agent counters stored in a human or LLM validation file."""
+    correct: int
+    incorrect: int
+    skipped: int
+    total_confidence: float
+    average_confidence: float
+
+
+class ValidationFile(TypedDict, total=False):
+    """The parts of a validation file the scorers read; field-level data is skipped."""
+    project_name: str
+    validation_date: str
+    evaluation_date: str
+    llm_model: str
+    basic_agent: AgentCounts
+    function_agent: AgentCounts
+    expert_agent: AgentCounts
+
+
+VALIDATION_DECODER = msgspec.json.Decoder(ValidationFile) if msgspec else None
+
+
+def load_validation_file(file_path: str) -> Dict:
+    """
+    Load the scoring-relevant parts of a validation file.
+
+    With msgspec installed the file is decoded straight into plain dicts,
+    skipping the large per-field sections; otherwise json.load is used.
+    Files whose summary doesn't match ValidationFile (e.g. float or null
+    counters from a hand edit) are decoded untyped, as without msgspec.
+    """
+    if VALIDATION_DECODER is not None:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        try:
+            return VALIDATION_DECODER.decode(content)
+        except msgspec.ValidationError:
+            return json.loads(content)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def create_agent_stats(with_confidence: bool = False) -> Dict:
+    """Create empty statistics for all three agents."""
+    agent_stats = {}
+    for agent_key in AGENT_KEYS:
+        if with_confidence:
+            agent_stats[agent_key] = {
+                "correct": 0,
+                "incorrect": 0,
+                "projects": [],
+                "total_confidence": 0.0,
+                "evaluated_fields": 0
+            }
+        else:
+            agent_stats[agent_key] = {
+                "correct": 0,
+                "incorrect": 0,
+                "skipped": 0,
+                "projects": [],
+                "processing_time_sum": 0.0,
+                "processing_time_count": 0
+            }
+    return agent_stats
+
+
+def calculate_accuracy(correct: int, incorrect: int) -> float:
+    """Return the accuracy percentage over evaluated (correct + incorrect) fields."""
+    evaluated = correct + incorrect
+    return (correct / evaluated * 100) if evaluated > 0 else 0
+
+
+def comparison_file_path(project_name: str) -> str:
+    """Return the path of a project's agent comparison file."""
+    return os.path.join("results", "comparison", f"{project_name}_comparison.json")
+
+
+def load_processing_times(project_name: str) -> Dict:
+    """Load per-agent processing times from the project's comparison file, if any."""
+    comparison_file = comparison_file_path(project_name)
+    if not os.path.exists(comparison_file):
+        return {}
+
+    try:
+        with open(comparison_file, 'r', encoding='utf-8') as cf:
+            comparison_data = json.load(cf)
+    except Exception:
+        return {}
+
+    processing_times = {}
+    for agent_key in AGENT_KEYS:
+        try:
+            processing_time = comparison_data[agent_key].get("processing_time")
+            if isinstance(processing_time, (int, float)):
+                processing_times[agent_key] = float(processing_time)
+        except Exception:
+            pass
+    return processing_times
+
+
+def score_project(data: Dict, with_confidence: bool = False) -> Tuple[Dict, Dict]:
+    """
+    Score a single validation file.
+
+    Args:
+        data: Parsed human or LLM validation file
+        with_confidence: True for LLM validation files (confidence instead of skipped/timing)
+
+    Returns:
+        Tuple of (project details entry, partial agent stats for this project only)
+    """
+    project_name = data.get("project_name", "unknown")
+
+    if with_confidence:
+        project_field_details = {
+            "project_name": project_name,
+            "evaluation_date": data.get("evaluation_date", ""),
+            "llm_model": data.get("llm_model", "unknown"),
+            "agents": {}
+        }
+        processing_times = {}
+    else:
+        project_field_details = {
+            "project_name": project_name,
+            "validation_date": data.get("validation_date", ""),
+            "agents": {}
+        }
+        processing_times = load_processing_times(project_name)
+
+    partial_stats = {}
+
+    for agent_key in AGENT_KEYS:
+        if agent_key not in data:
+            continue
+
+        agent_data = data[agent_key]
+        correct = agent_data.get("correct", 0)
+        incorrect = agent_data.get("incorrect", 0)
+        evaluated = correct + incorrect
+        accuracy = calculate_accuracy(correct, incorrect)
+
+        if with_confidence:
+            partial_stats[agent_key] = {
+                "correct": correct,
+                "incorrect": incorrect,
+                "projects": [project_name],
+                "total_confidence": agent_data.get("total_confidence", 0.0),
+                "evaluated_fields": evaluated
+            }
+            project_field_details["agents"][agent_key] = {
+                "correct": correct,
+                "incorrect": incorrect,
+                "evaluated": evaluated,
+                "accuracy": round(accuracy, 1),
+                "average_confidence": agent_data.get("average_confidence", 0.0)
+            }
+        else:
+            skipped = agent_data.get("skipped", 0)
+            partial_stats[agent_key] = {
+                "correct": correct,
+                "incorrect": incorrect,
+                "skipped": skipped,
+                "projects": [project_name],
+                "processing_time_sum": 0.0,
+                "processing_time_count": 0
+            }
+            project_field_details["agents"][agent_key] = {
+                "correct": correct,
+                "incorrect": incorrect,
+                "skipped": skipped,
+                "evaluated": evaluated,
+                "accuracy": round(accuracy, 1)
+            }
+
+            # Attach processing time from comparison if available
+            if agent_key in processing_times:
+                processing_time = processing_times[agent_key]
+                project_field_details["agents"][agent_key]["processing_time"] = round(processing_time, 3)
+                partial_stats[agent_key]["processing_time_sum"] = processing_time
+                partial_stats[agent_key]["processing_time_count"] = 1
+
+    return project_field_details, partial_stats
+
+
+def merge_agent_stats(agent_stats: Dict, partial_stats: Dict):
+    """Add partial per-agent stats into the running totals in place."""
+    for agent_key, agent_partial in partial_stats.items():
+        totals = agent_stats[agent_key]
+        for stat_name, value in agent_partial.items():
+            if isinstance(value, list):
+                totals[stat_name].extend(value)
+            else:
+                totals[stat_name] += value
+
+
+def combine_project_scores(scored_projects: List[Tuple[Dict, Dict]],
+                           with_confidence: bool = False) -> Tuple[Dict, List[Dict]]:
+    """
+    Combine per-project scores into overall agent stats.
+
+    Args:
+        scored_projects: List of (project details entry, partial agent stats) tuples
+        with_confidence: True for LLM validation files
+
+    Returns:
+        Tuple of (agent_stats, project_details)
+    """
+    agent_stats = create_agent_stats(with_confidence)
+    project_details = []
+
+    for project_field_details, partial_stats in scored_projects:
+        merge_agent_stats(agent_stats, partial_stats)
+        project_details.append(project_field_details)
+
+    if with_confidence:
+        # Calculate overall average confidence for each agent
+        for stats in agent_stats.values():
+            total_fields = stats["evaluated_fields"]
+            stats["overall_average_confidence"] = (
+                round(stats["total_confidence"] / total_fields, 3) if total_fields else 0.0
+            )
+
+    return agent_stats, project_details
+
+
+def aggregate_agent_scores(validation_data: List[Dict], with_confidence: bool = False) -> Tuple[Dict, List[Dict]]:
+    """
+    Aggregate per-agent scores across all projects in one pass.
+
+    Args:
+        validation_data: List of parsed validation files
+        with_confidence: True for LLM validation files
+
+    Returns:
+        Tuple of (agent_stats, project_details)
+    """
+    scored_projects = [score_project(data, with_confidence) for data in validation_data if data]
+    return combine_project_scores(scored_projects, with_confidence)
+
+
+def _file_signature(file_path: str):
+    """Return (mtime, size) for a file, or None if it does not exist."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_score_cache() -> Dict:
+    """Load the per-file score cache, or an empty one if missing or unreadable."""
+    try:
+        with open(SCORE_CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_score_cache(cache: Dict):
+    """Save the per-file score cache, evicting the least recently used entries."""
+    while len(cache) > SCORE_CACHE_MAX_ENTRIES:
+        del cache[next(iter(cache))]
+
+    try:
+        os.makedirs(os.path.dirname(SCORE_CACHE_FILE), exist_ok=True)
+        with open(SCORE_CACHE_FILE, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print(f"⚠️ Could not save score cache: {e}")
+
+
+def _score_file(file_path: str, with_confidence: bool = False):
+    """
+    Load and score one validation file. Runs in worker processes, so errors are returned.
+
+    Returns:
+        Tuple of (cache entry without the file signature or None, error message or None)
+    """
+    try:
+        data = load_validation_file(file_path)
+    except Exception as e:
+        return None, f"❌ Error loading {file_path}: {e}"
+    if not data:
+        return None, None
+
+    project_field_details, partial_stats = score_project(data, with_confidence)
+    comparison_signature = None
+    if not with_confidence:
+        comparison_signature = _file_signature(comparison_file_path(project_field_details["project_name"]))
+
+    return (comparison_signature, project_field_details, partial_stats), None
+
+
+def score_validation_files(file_paths: List[str], with_confidence: bool = False) -> List[Tuple[Dict, Dict]]:
+    """
+    Load and score each validation file, reusing cached scores for unchanged files.
+
+    A file's cached score is reused while its (mtime, size) is unchanged and, for
+    human validation, while the project's comparison file is unchanged too. When
+    many files need scoring they are spread over a process pool.
+
+    Args:
+        file_paths: Paths of the validation files to score
+        with_confidence: True for LLM validation files
+
+    Returns:
+        List of (project details entry, partial agent stats) tuples
+    """
+    cache = load_score_cache()
+    file_signatures = {}
+    pending_files = []
+
+    for file_path in file_paths:
+        file_signatures[file_path] = _file_signature(file_path)
+        cached = cache.pop(file_path, None)
+
+        if cached is not None and cached[0] == file_signatures[file_path]:
+            comparison_signature, project_field_details, _ = cached[1:]
+            project_name = project_field_details["project_name"]
+            if with_confidence or _file_signature(comparison_file_path(project_name)) == comparison_signature:
+                cache[file_path] = cached
+                continue
+
+        pending_files.append(file_path)
+
+    if len(pending_files) >= PARALLEL_SCORING_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(partial(_score_file, with_confidence=with_confidence),
+                                        pending_files, chunksize=8))
+    else:
+        results = [_score_file(file_path, with_confidence) for file_path in pending_files]
+
+    for file_path, (entry, error) in zip(pending_files, results):
+        if error:
+            print(error)
+        if entry is not None:
+            cache[file_path] = (file_signatures[file_path],) + entry
+
+    # Keep the caller's file order
+    scored_projects = []
+    for file_path in file_paths:
+        cached = cache.get(file_path)
+        if cached is not None and cached[0] == file_signatures[file_path]:
+            scored_projects.append((cached[2], cached[3]))
+
+    save_score_cache(cache)
+    return scored_projects
@@ -2,7 +2,24 @@
 Utility functions for the crawler agent.
 """
 
-from google.generativeai.types import FunctionDeclaration
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is used without it
+    orjson = None
+
+# Agent results keyed by a hash of the agent code, settings, HTML and config
+AGENT_CACHE_DIR = "results/.agent_cache"
+
+# Rough size of a token in characters, for budgeting requests before the API reports their real size
+CHARS_PER_TOKEN = 4
 
 
 def create_function_declaration_from_config(config):
@@ -15,6 +32,9 @@ def create_function_declaration_from_config(config):
     Returns:
         FunctionDeclaration: The dynamically created function declaration
     """
+    # Imported here so scripts that only need the JSON helpers don't require the Gemini SDK
+    from google.generativeai.types import FunctionDeclaration
+
     # Build the description with field details
     field_descriptions = []
     for field_name, field_config in config["fields"].items():
@@ -96,3 +116,242 @@ def proto_to_dict(obj):
         return result
     else:
         return obj
+
+
+def json_bytes(data, indent: bool = True) -> bytes:
+    """
+    Serialize data to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Args:
+        data: JSON-serializable data
+        indent (bool): Indent with two spaces (default: True); compact otherwise
+
+    Returns:
+        bytes: The encoded JSON document
+    """
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def dump_json(data, file_path: str):
+    """
+    Write data to a file as indented UTF-8 JSON.
+
+    Args:
+        data: JSON-serializable data
+        file_path (str): Output file path
+    """
+    with open(file_path, 'wb') as f:
+        f.write(json_bytes(data))
+
+
+def dump_json_atomic(data, file_path: str):
+    """
+    Write data to a file as indented UTF-8 JSON, replacing the file in one step.
+
+    The data is written to a temporary file that is then renamed over file_path, so an
+    interrupted write (e.g. Ctrl+C) or a concurrent reader never sees a partial file.
+
+    Args:
+        data: JSON-serializable data
+        file_path (str): Output file path
+    """
+    # Unique per process and thread, so concurrent writers of the same file don't share it
+    tmp_file = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(json_bytes(data))
+        os.replace(tmp_file, file_path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def loads_json(content):
+    """
+    Decode a JSON document from bytes or str, using orjson when it is installed.
+
+    Args:
+        content: The encoded JSON document
+
+    Returns:
+        The decoded data
+    """
+    return orjson.loads(content) if orjson else json.loads(content)
+
+
+def load_json(file_path: str):
+    """
+    Load a JSON file, using orjson when it is installed.
+
+    Args:
+        file_path (str): Path to the JSON file
+
+    Returns:
+        The decoded data
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return loads_json(content)
+
+
+def load_config(config_file_path: str):
+    """
+    Load an extraction configuration file, parsing each version of the file only once.
+
+    The parsed config is shared by every caller (and every agent), so it must be
+    treated as read-only. Editing the file on disk is picked up on the next call.
+
+    Args:
+        config_file_path (str): Path to the configuration file
+
+    Returns:
+        dict: The parsed configuration
+    """
+    stat = os.stat(config_file_path)
+    return _load_config_version(os.path.abspath(config_file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _load_config_version(config_file_path: str, mtime_ns: int, size: int):
+    """Parse one version of a config file; the file signature is part of the cache key."""
+    return load_json(config_file_path)
+
+
+def agent_cache_enabled():
+    """
+    Whether agent results are reused; set AGENT_CACHE=0 to always call the agents.
+
+    Read on each call rather than at import, so a value from .env is seen once it is loaded.
+    """
+    return os.getenv("AGENT_CACHE", "1") != "0"
+
+
+@lru_cache(maxsize=None)
+def agent_code_fingerprint(agent_class):
+    """
+    Hash the source files of an agent class and its base classes, so editing an agent's
+    code or hard-coded prompts starts fresh cache entries.
+
+    Args:
+        agent_class: Class of the agent
+
+    Returns:
+        bytes: Digest of the source files
+    """
+    code_hash = hashlib.blake2b(digest_size=16)
+    for cls in agent_class.__mro__:
+        module_file = getattr(sys.modules.get(cls.__module__), "__file__", None)
+        if module_file:
+            with open(module_file, 'rb') as f:
+                code_hash.update(f.read())
+    return code_hash.digest()
+
+
+def agent_cache_file(agent, html_bytes, config_bytes):
+    """
+    Get the cache file for an agent run on the given inputs.
+
+    The key covers the agent class, its code and its settings (model, prompts, voting
+    rounds, ...), so changing any of them or the HTML/config starts a fresh entry.
+
+    Args:
+        agent: Agent instance that will process the inputs
+        html_bytes (bytes): Raw HTML input
+        config_bytes (bytes): Raw configuration file
+
+    Returns:
+        str: Path of the cache file for this agent and inputs
+    """
+    settings = sorted((key, value) for key, value in vars(agent).items() if key != "api_key")
+    key_hash = hashlib.blake2b(digest_size=16)
+    for part in (type(agent).__name__.encode(), agent_code_fingerprint(type(agent)), repr(settings).encode(),
+                 html_bytes, config_bytes):
+        # Length-prefix each part so different splits of the same bytes can't collide
+        key_hash.update(len(part).to_bytes(8, "little"))
+        key_hash.update(part)
+    return os.path.join(AGENT_CACHE_DIR, f"{key_hash.hexdigest()}.json")
+
+
+def load_cached_result(cache_file: str):
+    """
+    Load a cached agent result.
+
+    Args:
+        cache_file (str): Path from agent_cache_file
+
+    Returns:
+        Dict with "processing_time" and "data", or None if there is no usable entry
+        (missing, unreadable or of another shape); the agent should then run again
+    """
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        cached = load_json(cache_file)
+    except ValueError:
+        return None
+    if not isinstance(cached, dict) or "processing_time" not in cached or "data" not in cached:
+        return None
+    return cached
+
+
+def store_cached_result(cache_file: str, processing_time: float, data):
+    """
+    Cache an agent result, replacing the entry in one step so an interrupted run can't leave a torn one.
+
+    Args:
+        cache_file (str): Path from agent_cache_file
+        processing_time (float): Seconds the agent took
+        data: The saved extraction data
+    """
+    dump_json_atomic({"processing_time": processing_time, "data": data}, cache_file)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many tokens a prompt uses, from its length."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class RequestRateLimiter:
+    """
+    Thread-safe token bucket: allows bursts of up to `rate` units (requests or tokens),
+    refilled at `rate` units per `period` seconds, and blocks callers only once it is empty.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        """Add the units that came back since the last update; call with the lock held."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1):
+        """Take `amount` units (one request by default), sleeping until they are available."""
+        # A single request larger than the whole bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+    def record(self, amount: float):
+        """
+        Charge (or refund, if negative) units without waiting, e.g. to correct an
+        estimate once the real usage is known; later callers wait for any overdraft.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= amount
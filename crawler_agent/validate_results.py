@@ -5,10 +5,21 @@ Allows manual validation of each extracted field and saves results to validation
 """
 
 import os
-import json
 import random
 from datetime import datetime
 
+try:
+    from crawler_agent.utils import dump_json_atomic, load_json
+except ImportError:  # run as a script from crawler_agent/
+    from utils import dump_json_atomic, load_json
+
+
+# Counter bucket for each validation result; anything else (None) counts as skipped
+RESULT_COUNTERS = {True: "correct", False: "incorrect"}
+
+# Agents whose results are validated, in the order load_project_results returns them
+AGENTS = ("basic", "function", "expert")
+
 
 def create_validation_directory():
     """Create validation directory if it doesn't exist."""
@@ -20,28 +31,14 @@ def create_validation_directory():
 
 
 def load_project_results(project_name):
-    """Load results from all three agents for a project."""
-    basic_file = f"results/basic/{project_name}_basic.json"
-    function_file = f"results/function/{project_name}_function.json"
-    expert_file = f"results/expert/{project_name}_expert.json"
-
-    basic_data = None
-    function_data = None
-    expert_data = None
-
-    if os.path.exists(basic_file):
-        with open(basic_file, 'r', encoding='utf-8') as f:
-            basic_data = json.load(f)
-
-    if os.path.exists(function_file):
-        with open(function_file, 'r', encoding='utf-8') as f:
-            function_data = json.load(f)
-
-    if os.path.exists(expert_file):
-        with open(expert_file, 'r', encoding='utf-8') as f:
-            expert_data = json.load(f)
-
-    return basic_data, function_data, expert_data
+    """Load results from all three agents for a project (None for an agent without a result file)."""
+    results = []
+    for agent in AGENTS:
+        try:
+            results.append(load_json(f"results/{agent}/{project_name}_{agent}.json"))
+        except FileNotFoundError:
+            results.append(None)
+    return tuple(results)
 
 
 def extract_project_fields(data):
@@ -187,11 +184,8 @@ def validate_project(project_name):
     print(f"   Function Agent: {'✅' if function_data else '❌'} ({len(function_fields)} fields)")
     print(f"   Expert Agent: {'✅' if expert_data else '❌'} ({len(expert_fields)} fields)")
 
-    # Get all unique field names
-    all_fields = set()
-    all_fields.update(basic_fields.keys())
-    all_fields.update(function_fields.keys())
-    all_fields.update(expert_fields.keys())
+    # Get all unique field names, in the order they are validated
+    all_fields = sorted(basic_fields.keys() | function_fields.keys() | expert_fields.keys())
 
     if not all_fields:
         print("❌ No fields found to validate")
@@ -213,7 +207,7 @@ def validate_project(project_name):
     }
 
     # Validate each field
-    for field_name in sorted(all_fields):
+    for field_name in all_fields:
         basic_value = basic_fields.get(field_name)
         function_value = function_fields.get(field_name)
         expert_value = expert_fields.get(field_name)
@@ -232,15 +226,8 @@ def validate_project(project_name):
         }
 
         # Update counters
-        for i, (agent_key, result) in enumerate(zip(
-                ["basic_agent", "function_agent", "expert_agent"], results
-        )):
-            if result is True:
-                validation_results[agent_key]["correct"] += 1
-            elif result is False:
-                validation_results[agent_key]["incorrect"] += 1
-            else:  # None (skipped)
-                validation_results[agent_key]["skipped"] += 1
+        for agent_key, result in zip(["basic_agent", "function_agent", "expert_agent"], results):
+            validation_results[agent_key][RESULT_COUNTERS.get(result, "skipped")] += 1
 
     return validation_results
 
@@ -255,8 +242,7 @@ def save_validation_results(validation_results):
     filename = f"{project_name}_validation.json"
     filepath = os.path.join(validation_dir, filename)
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(validation_results, f, indent=2, ensure_ascii=False)
+    dump_json_atomic(validation_results, filepath)
 
     print(f"\n💾 Validation results saved to: {filepath}")
 